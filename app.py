@@ -1,91 +1,359 @@
+import math
 import os
-import locale
+import queue
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import weakref
 
 from cs50 import SQL
-from flask import Flask, flash, redirect, render_template, request, session
+from flask import Blueprint, Flask, Response, current_app, flash, jsonify, redirect, render_template, request, session, stream_with_context
+from flask.sessions import SessionInterface
 from flask_session import Session
-from werkzeug.security import check_password_hash, generate_password_hash
 from datetime import datetime
+from functools import lru_cache, wraps
+from pathlib import Path
+from werkzeug.local import LocalProxy
 
-from helpers import apology, login_required, format_currency, format_date
-from translations import translations
+from forecast import add_months
+from passwords import HasherBusy, hasher_from_config
+from events import EventBroker, format_event
+from helpers import apology, login_required, format_currency, format_date, localize_event
+from i18n import TranslatedEnvironment, catalogs, get_catalog, get_lang
+from writer import GroupCommitWriter
+import queries
 
 
-# Configure application
-app = Flask(__name__)
+# Routes are registered on every app built by create_app()
+bp = Blueprint("mybudget", __name__)
 
-# Custom filter
-app.jinja_env.filters["format_currency"] = format_currency
-app.jinja_env.filters['dateformat'] = format_date
+# Guards the lazy creation of per-app resources below
+_init_lock = threading.RLock()
 
-# Configure session to use filesystem (instead of signed cookies)
-app.config["SESSION_PERMANENT"] = False
-app.config["SESSION_TYPE"] = "filesystem"
-Session(app)
 
-# Configure CS50 Library to use SQLite database
-db = SQL("sqlite:///budget.db")
+def create_app(config=None):
+    """
+    Build a configured app. Nothing expensive happens here: the database,
+    session store, writer and hasher are set up on first use.
 
-# Auxiliar Function
-def process_recurring_transactions(user_id):
-    """Checks and adds recurring transactions for the current month if not already added."""
+    DATABASE is a file path or ":memory:" (a temporary file private to this app,
+    removed with it); an empty database gets schema.sql applied.
+    """
 
-    current_month = datetime.now().strftime('%Y-%m') # '2025-10'
+    app = Flask(__name__)
 
-    # Get all user's recurring transaction rules
-    recurring_rules = db.execute(
-        "SELECT * FROM recurring_transactions WHERE user_id = ?", user_id
-    )
+    # Defaults, overridable by config
+    app.config["DATABASE"] = os.environ.get("MYBUDGET_DATABASE", "budget.db")
+    app.config["GROUP_COMMIT"] = os.environ.get("MYBUDGET_GROUP_COMMIT") == "1"
+    app.config["HASH_METHOD"] = os.environ.get("MYBUDGET_HASH_METHOD", "scrypt")
+    app.config["HASH_WORKERS"] = int(os.environ.get("MYBUDGET_HASH_WORKERS", 2))
+    app.config["HASH_QUEUE"] = int(os.environ.get("MYBUDGET_HASH_QUEUE", 16))
+    app.config["EVENTS_STREAM_SECONDS"] = int(os.environ.get("MYBUDGET_EVENTS_STREAM_SECONDS", 60))
 
-    for rule in recurring_rules:
-        # if the transaction wasn't added yet this month
-        if rule["last_added"] != current_month:
-            day = min(rule["day_of_month"], 28)
-            transaction_date = f"{current_month}-{str(day).zfill(2)} 00:00:00"
+    # Configure session to use filesystem (instead of signed cookies)
+    app.config["SESSION_PERMANENT"] = False
+    app.config["SESSION_TYPE"] = "filesystem"
 
-            # Insert the transaction in the transactions table
-            db.execute(
-                "INSERT INTO transactions (user_id, description, amount, type, category, timestamp) VALUES (?, ?, ?, ?, ?, ?)", user_id, rule["description"], rule["amount"], rule["type"], rule["category"], transaction_date
-            )
+    if config:
+        app.config.update(config)
 
-            # Update that the rule was already processed this month
-            db.execute (
-                "UPDATE recurring_transactions SET last_added = ? WHERE id = ?", current_month, rule["id"]
-            )
-    return
+    # A shared-cache in-memory database fails concurrent writers with "database table is locked"
+    # instead of waiting out the busy timeout, so ":memory:" gets a throwaway file instead
+    if app.config["DATABASE"] == ":memory:":
+        directory = tempfile.mkdtemp(prefix="mybudget-")
+        weakref.finalize(app, shutil.rmtree, directory, ignore_errors=True)
+        app.config["DATABASE"] = os.path.join(directory, "budget.db")
 
+    # sqlite3 URI shared by every connection to this app's database
+    app.config["DATABASE_URI"] = Path(app.config["DATABASE"]).resolve().as_uri()
 
-def copy_previous_budgets(user_id):
-    """Copy last month's budgets to the actual month"""
+    # Templates are compiled per language with their static translation keys resolved
+    app.jinja_environment = TranslatedEnvironment
 
-    current_month = datetime.now().strftime('%Y-%m')
+    # Custom filter
+    app.jinja_env.filters["format_currency"] = format_currency
+    app.jinja_env.filters['dateformat'] = format_date
+
+    app.session_interface = LazySessionInterface()
+    app.extensions["mybudget"] = {}
+    app.register_blueprint(bp)
+
+    return app
+
+
+class LazySessionInterface(SessionInterface):
+    """Set up Flask-Session on the first request instead of when the app is created."""
+
+    def _session_interface(self, app):
+        with _init_lock:
+            if app.session_interface is self:
+                Session(app)
+        return app.session_interface
+
+    def open_session(self, app, request):
+        return self._session_interface(app).open_session(app, request)
+
+    def save_session(self, app, session, response):
+        return self._session_interface(app).save_session(app, session, response)
+
+
+def get_resource(name, factory):
+    """Return the current app's resource called name, creating it with factory(app) on first use."""
+    resources = current_app.extensions["mybudget"]
+    if name not in resources:
+        with _init_lock:
+            if name not in resources:
+                resources[name] = factory(current_app._get_current_object())
+    return resources[name]
+
+
+def open_database(app):
+    """Connect CS50 Library to the app's SQLite database, creating its tables if it's empty."""
+
+    connection = sqlite3.connect(app.config["DATABASE_URI"], uri=True)
+    try:
+        if not connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'users'").fetchone():
+            with open(os.path.join(app.root_path, "schema.sql")) as f:
+                connection.executescript(f.read())
+        upgrade_database(connection, app.root_path)
+    finally:
+        connection.close()
+
+    return SQL(f"sqlite:///{app.config['DATABASE']}")
+
+
+def upgrade_database(connection, root_path):
+    """Bring a database made from an older schema.sql up to date. Safe to run on every start."""
+
+    columns = [row[1] for row in connection.execute("PRAGMA table_info(users)")]
+    if "data_version" not in columns:
+        connection.execute("ALTER TABLE users ADD COLUMN data_version INTEGER NOT NULL DEFAULT 0")
+
+    columns = [row[1] for row in connection.execute("PRAGMA table_info(transactions)")]
+    if "recurring_id" not in columns:
+        connection.execute("ALTER TABLE transactions ADD COLUMN recurring_id INTEGER")
+        # Older rows aren't marked: guess from the rule's fields and the midnight time the rules use
+        connection.execute(
+            "UPDATE transactions SET recurring_id = (SELECT r.id FROM recurring_transactions r WHERE r.user_id = transactions.user_id AND r.description = transactions.description AND r.category = transactions.category AND r.amount = transactions.amount AND r.type = transactions.type) WHERE time(timestamp) = '00:00:00'"
+        )
+    connection.execute("CREATE INDEX IF NOT EXISTS transactions_user_type_time ON transactions(user_id, type, timestamp)")
 
-    current_budgets = db.execute(
-        "SELECT id FROM budgets WHERE user_id = ? AND month = ?", user_id, current_month
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS daily_balances (user_id INTEGER NOT NULL, day TEXT NOT NULL, net NUMERIC NOT NULL, balance NUMERIC NOT NULL, FOREIGN KEY(user_id) REFERENCES users(id), PRIMARY KEY(user_id, day))"
     )
+    connection.commit()
+
+    # The triggers keep daily_balances and data_version up to date; installing them also rebuilds the balances
+    if not connection.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name = 'transactions_insert'").fetchone():
+        with open(os.path.join(root_path, "triggers.sql")) as f:
+            connection.executescript(f"BEGIN;\n{f.read()}\nCOMMIT;")
+
+
+def start_writer(app):
+    """Start the optional group-commit writer for transaction inserts (GROUP_COMMIT config)."""
+    if not app.config["GROUP_COMMIT"]:
+        return None
+    get_resource("db", open_database)
+    writer = GroupCommitWriter(app.config["DATABASE_URI"])
+    writer.start()
+    return writer
+
+
+def close_resources(app):
+    """Stop the app's writer (after its pending writes) and hashing processes."""
+    resources = app.extensions["mybudget"]
+    if resources.get("writer"):
+        resources["writer"].stop()
+    if resources.get("hasher"):
+        resources["hasher"].close()
+
+
+# Per-app resources, created on first use
+db = LocalProxy(lambda: get_resource("db", open_database))
+writer = LocalProxy(lambda: get_resource("writer", start_writer))
+
+# Password hashing runs on a bounded process pool (see HASH_* config)
+hasher = LocalProxy(lambda: get_resource("hasher", lambda app: hasher_from_config(app.config)))
+
+# Live dashboard updates for open /events streams (in-process, per worker)
+broker = LocalProxy(lambda: get_resource("broker", lambda app: EventBroker()))
+
+# Validation shared by the form routes and the JSON API. Each returns (error, values)
+def parse_amount(value):
+    """float(value), raising ValueError for JSON booleans, NaN and infinities as well"""
+    if isinstance(value, bool):
+        raise ValueError(value)
+    amount = float(value)
+    if not math.isfinite(amount):
+        raise ValueError(value)
+    return amount
+
+
+def validate_transaction(data):
+    """Check a transaction's amount, type and category"""
+
+    amount = data.get("amount")
+    transaction_type = data.get("type")
+    category = data.get("category")
+
+    if not amount:
+        return "missing_value", None
+    if not transaction_type:
+        return "missing_type", None
+    if not category:
+        return "missing_category", None
+    if transaction_type not in ["Income", "Expense"]:
+        return "invalid_type", None
+
+    try:
+        amount = parse_amount(amount)
+        if amount <= 0:
+            raise ValueError
+    except (TypeError, ValueError):
+        return "invalid_value", None
+
+    return None, {"amount": amount, "type": transaction_type, "category": category, "description": data.get("description")}
+
+
+def validate_budget(data):
+    """Check a budget's category and amount"""
+
+    category = data.get("category")
+    amount = data.get("amount")
+
+    if not category or amount is None or amount == "":
+        return "invalid_budget", None
+    try:
+        amount = parse_amount(amount)
+        if amount < 0: raise ValueError
+    except (TypeError, ValueError):
+        return "invalid_value", None
+
+    return None, {"category": category, "amount": amount}
+
+
+def validate_recurring(data):
+    """Check a recurring rule's fields and day of month"""
+
+    amount = data.get("amount")
+    transaction_type = data.get("type")
+    description = data.get("description")
+    category = data.get("category")
+    day = data.get("day_of_month")
+
+    if not all([amount, transaction_type, description, category, day]):
+        return "missing_recurring", None
+    try:
+        amount = parse_amount(amount)
+        if isinstance(day, bool):
+            raise ValueError(day)
+        day = int(day)
+        if amount <= 0 or not (1 <= day <= 31) or transaction_type not in ["Income", "Expense"]:
+            raise ValueError
+    except (TypeError, ValueError):
+        return "invalid_recurring", None
+
+    return None, {"amount": amount, "type": transaction_type, "description": description, "category": category, "day_of_month": day}
 
-    if len(current_budgets) > 0:
+
+def run_query(plan):
+    """Run a plan from queries.py on the app's database, batching transaction inserts when the writer is enabled."""
+    return queries.run(plan, db.execute, writer.execute if writer else db.execute)
+
+
+# Auxiliar Function
+def insert_transaction(user_id, description, amount, transaction_type, category, timestamp=None):
+    """Insert a transaction and return its id, batching it with other writes when the writer is enabled."""
+    return run_query(queries.insert_transaction(user_id, description, amount, transaction_type, category, timestamp))
+
+
+def get_data_version(user_id):
+    """Counter the triggers in triggers.sql bump on every change to the user's transactions or budgets"""
+    return db.execute("SELECT data_version FROM users WHERE id = ?", user_id)[0]["data_version"]
+
+
+def publish_dashboard_update(user_id, category=None):
+    """Push the new month totals, and the budget bar of category if given, to the user's open dashboards."""
+
+    if not broker.has_subscribers(user_id):
         return
-    
-    last_month_recorded = db.execute(
-        "SELECT MAX(month) as last_month FROM budgets WHERE user_id = ? AND month < ?", user_id, current_month
-    )
 
-    last_month = last_month_recorded[0]["last_month"]
+    current_month = datetime.now().strftime('%Y-%m')
 
-    if last_month:
-        db.execute(
-            "INSERT INTO budgets (user_id, category_name, amount, month) SELECT user_id, category_name, amount, ? FROM budgets WHERE user_id = ? AND month = ?", current_month, user_id, last_month
+    income, expense = run_query(queries.month_totals(user_id, current_month))
+    broker.publish(user_id, "totals", {"income": income, "expense": expense, "balance": income - expense})
+
+    if category is None:
+        return
+
+    budget = db.execute(
+        "SELECT amount FROM budgets WHERE user_id = ? AND category_name = ? AND month = ?", user_id, category, current_month
+    )
+    if not budget:
+        return
+    spent = db.execute(
+        "SELECT SUM(amount) as total FROM transactions WHERE user_id = ? AND type = 'Expense' AND category = ? AND strftime('%Y-%m', timestamp) = ?", user_id, category, current_month
+    )[0]["total"] or 0
+    budgeted = budget[0]["amount"]
+    broker.publish(user_id, "budget", {
+        "category": category,
+        "budgeted": budgeted,
+        "spent": spent,
+        "percentage": (spent / budgeted) * 100 if budgeted > 0 else 0
+    })
+
+
+@lru_cache(maxsize=256)
+def budget_analytics(database, user_id, months, last_month, data_version):
+    """Budgeted vs. actual per category and month for the `months` months ending with last_month ('YYYY-MM'), in one windowed query.
+
+    database and data_version are only part of the cache key: the triggers bump the version on any
+    write to transactions or budgets, and last_month moves the window, so stale results are never reused.
+    """
+
+    month_start = datetime.strptime(last_month, '%Y-%m').date()
+    first_month = add_months(month_start, -(months - 1)).strftime('%Y-%m')
+    # Spending is needed from a year before the first month for the year-over-year column
+    spending_start = add_months(month_start, -(months + 11)).isoformat()
+
+    return db.execute(
+        """SELECT category, month, budgeted, actual, last_year_actual,
+            actual > budgeted as overrun,
+            AVG(actual) OVER rolling as rolling_actual,
+            AVG(budgeted) OVER rolling as rolling_budgeted,
+            SUM(actual > budgeted) OVER per_category as overrun_months,
+            SUM(budgeted) OVER per_category as total_budgeted,
+            SUM(actual) OVER per_category as total_actual
+        FROM (
+            SELECT b.category_name as category, b.month, b.amount as budgeted,
+                COALESCE(SUM(CASE WHEN s.month = b.month THEN s.total END), 0) as actual,
+                SUM(CASE WHEN s.month != b.month THEN s.total END) as last_year_actual
+            FROM budgets b
+            LEFT JOIN (
+                SELECT category, strftime('%Y-%m', timestamp) as month, SUM(amount) as total
+                FROM transactions WHERE user_id = ? AND type = 'Expense' AND timestamp >= ?
+                GROUP BY category, month
+            ) s ON s.category = b.category_name AND s.month IN (b.month, strftime('%Y-%m', b.month || '-01', '-12 months'))
+            WHERE b.user_id = ? AND b.month >= ? AND b.month <= ?
+            GROUP BY b.id
         )
+        WINDOW rolling AS (PARTITION BY category ORDER BY month ROWS BETWEEN 2 PRECEDING AND CURRENT ROW),
+            per_category AS (PARTITION BY category)
+        ORDER BY category, month""",
+        user_id, spending_start, user_id, first_month, last_month
+    )
 
-@app.context_processor
+
+@bp.app_context_processor
 def inject_conf_var():
-    lang = session.get("language", "en")
+    lang = get_lang()
 
-    return dict(lang=lang, t=translations[lang])
+    return dict(lang=lang, t=catalogs[lang])
 
 
-@app.after_request
+@bp.after_app_request
 def after_request(response):
     """Ensure responses aren't cached"""
     response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
@@ -94,7 +362,62 @@ def after_request(response):
     return response
 
 
-@app.route("/set_language/<lang>")
+@bp.route("/metrics")
+def metrics():
+    """Export password hashing latency and queue depth"""
+    return hasher.metrics(), 200, {"Content-Type": "text/plain; version=0.0.4"}
+
+
+@bp.route("/events")
+@login_required
+def events():
+    """
+    Stream dashboard updates to the user's browser (Server-Sent Events).
+
+    Each open stream holds a worker thread, so it ends after EVENTS_STREAM_SECONDS
+    and the browser reconnects (retry:); a sync worker is only lent out for that
+    long. In ASGI mode asgi.py serves /events itself, without holding threads.
+    The stream ends with the user's data_version as its event id: a reconnect
+    whose Last-Event-ID doesn't match anymore missed updates and gets "stale".
+    """
+
+    user_id = session["user_id"]
+    deadline = time.monotonic() + current_app.config["EVENTS_STREAM_SECONDS"]
+    subscription = broker.subscribe(user_id)
+    last_version = request.headers.get("Last-Event-ID")
+
+    @stream_with_context
+    def stream():
+        try:
+            yield "retry: 5000\n\n"
+            # Changes made while no stream was open: the page has to reload to show them
+            if last_version is not None and last_version != str(get_data_version(user_id)):
+                yield format_event("stale", {})
+                return
+
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    event, data = subscription.get(timeout=min(remaining, 15))
+                except queue.Empty:
+                    # Keep idle connections from being closed by proxies
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_event(event, localize_event(data))
+
+            # Everything up to this version has been delivered
+            version = get_data_version(user_id)
+            broker.unsubscribe(user_id, subscription)
+            while not subscription.empty():
+                event, data = subscription.get_nowait()
+                yield format_event(event, localize_event(data))
+            yield f"id: {version}\n\n"
+        finally:
+            broker.unsubscribe(user_id, subscription)
+
+    return Response(stream(), mimetype="text/event-stream", headers={"X-Accel-Buffering": "no"})
+
+
+@bp.route("/set_language/<lang>")
 def set_language(lang):
     """Defines app's language"""
     if lang in ["en", "pt"]:
@@ -102,74 +425,14 @@ def set_language(lang):
     return redirect(request.referrer or "/")
 
 
-@app.route("/")
+@bp.route("/")
 @login_required
 def index():
     """Show user's financial dashboard"""
+    return render_template("index.html", **run_query(queries.dashboard(session["user_id"])))
 
-    # Get user's id from the session
-    user_id = session["user_id"]
-
-    copy_previous_budgets(user_id)
-
-    process_recurring_transactions(user_id)
-
-    # Current year and month
-    current_year = datetime.now().year
-    current_month = datetime.now().month
-
-    # Search user's name for greeting
-    username = db.execute("SELECT username FROM users WHERE id = ?", user_id)[0]["username"]
-
-    # Total monthly income
-    income_rows = db.execute(
-        "SELECT SUM(amount) as total FROM transactions WHERE user_id = ? AND type = 'Income' AND strftime('%m', timestamp) = ? AND strftime('%Y', timestamp) = ?", user_id, str(current_month).zfill(2), str(current_year)
-    )
-    total_income = income_rows[0]["total"] or 0 # Use 0 if not incomes
-
-    # Total monthly expenses
-    expense_rows = db.execute(
-      "SELECT SUM(amount) as total FROM transactions WHERE user_id = ? AND type = 'Expense' AND strftime('%m', timestamp) = ? AND strftime('%Y', timestamp) = ?", user_id, str(current_month).zfill(2), str(current_year)
-    )
-    total_expense = expense_rows[0]["total"] or 0 # Use 0 if not expenses
-
-    # Balance
-    balance = total_income - total_expense
-
-    # Last 5 transactions
-    recent_transactions = db.execute (
-        "SELECT * FROM transactions WHERE user_id = ? ORDER BY timestamp DESC LIMIT 5", user_id
-    )
-
-    # Budget's progress
-    budget_progress = []
-    budgets = db.execute(
-        "SELECT category_name, amount FROM budgets WHERE user_id = ? AND month = ?", user_id, f"{current_year}-{str(current_month).zfill(2)}"
-    )
-
-    # Get total expense by category
-    expenses_by_category = db.execute(
-        "SELECT category, SUM(amount) as total FROM transactions WHERE user_id = ? AND type = 'Expense' AND strftime('%Y-%m', timestamp) = ? GROUP BY category", user_id, f"{current_year}-{str(current_month).zfill(2)}"
-    )
-
-    # Transform the expenses list into a dictionary for easy search
-    spent_map = {item['category']: item['total'] for item in expenses_by_category}
-
-    for budget in budgets:
-        category = budget["category_name"]
-        spent= spent_map.get(category, 0) # Get the expense or 0, if it doesn't exist
-        percentage = (spent / budget["amount"]) * 100 if budget["amount"] > 0 else 0
-        budget_progress.append({
-            "category": category,
-            "budgeted": budget["amount"],
-            "spent": spent,
-            "percentage": percentage
-        })
-
-    return render_template("index.html", username=username, total_income=total_income, total_expense=total_expense, balance=balance, recent_transactions=recent_transactions, budget_progress=budget_progress)
 
-
-@app.route("/login", methods=["GET", "POST"])
+@bp.route("/login", methods=["GET", "POST"])
 def login():
     """Log user in"""
 
@@ -196,10 +459,19 @@ def login():
         )
 
         # Ensure username exists and password is correct
-        if len(rows) != 1 or not check_password_hash(
-            rows[0]["hash"], request.form.get("password")
-        ):
-            return apology("invalid_login", 403)
+        try:
+            if len(rows) != 1 or not hasher.verify(rows[0]["hash"], request.form.get("password")):
+                return apology("invalid_login", 403)
+        except HasherBusy:
+            return apology("server_busy", 503)
+
+        # Upgrade the stored hash if the hashing parameters changed;
+        # the password is already verified, so a busy hasher just leaves it for a later login
+        if hasher.needs_rehash(rows[0]["hash"]):
+            try:
+                db.execute("UPDATE users SET hash = ? WHERE id = ?", hasher.hash(request.form.get("password")), rows[0]["id"])
+            except HasherBusy:
+                pass
 
         # Remember which user has logged in
         session["user_id"] = rows[0]["id"]
@@ -212,7 +484,7 @@ def login():
         return render_template("login.html")
 
 
-@app.route("/logout")
+@bp.route("/logout")
 def logout():
     """Log user out"""
 
@@ -223,7 +495,7 @@ def logout():
     return redirect("/")
 
 
-@app.route("/register", methods=["GET", "POST"])
+@bp.route("/register", methods=["GET", "POST"])
 def register():
     """Register user"""
 
@@ -252,8 +524,12 @@ def register():
             return apology("used_username", 400)
 
         # Register the user
-        db.execute("INSERT INTO users (username, hash) VALUES (?, ?)", request.form.get(
-            "username"), generate_password_hash(request.form.get("password")))
+        try:
+            pwhash = hasher.hash(request.form.get("password"))
+        except HasherBusy:
+            return apology("server_busy", 503)
+
+        db.execute("INSERT INTO users (username, hash) VALUES (?, ?)", request.form.get("username"), pwhash)
 
         # Search the updated database
         rows = db.execute("SELECT * FROM users WHERE username=?", request.form.get("username"))
@@ -268,7 +544,7 @@ def register():
         return render_template("register.html")
 
 
-@app.route("/add", methods=["GET", "POST"])
+@bp.route("/add", methods=["GET", "POST"])
 @login_required
 def add():
     transactions = ["Income", "Expense"]
@@ -276,100 +552,67 @@ def add():
 
     if request.method == "POST":
         # input of the value and the type of transaction
-        amount = request.form.get("amount")
-        transaction_type = request.form.get("type")
-        description = request.form.get("description")
-        category = request.form.get("category")
-        lang = session.get("language", "en")
-
-        if not amount:
-            return apology("missing_value", 400)
-        if not transaction_type:
-            return apology("missing_type", 400)
-        if not category:
-            return apology("missing_category", 400)
-        if transaction_type not in ["Income", "Expense"]:
-            return apology("invalid_type", 400)
+        error, values = validate_transaction(request.form)
+        if error:
+            return apology(error, 400)
 
-        try:
-            amount = float(amount)
-            if amount <= 0:
-                raise ValueError
-        except ValueError:
-            return apology("invalid_value", 400)
+        amount = values["amount"]
+        transaction_type = values["type"]
+        description = values["description"]
+        category = values["category"]
 
-        db.execute(
-            "INSERT INTO transactions (user_id, description, amount, type, category) VALUES (?, ?, ?, ?, ?)", session["user_id"], description, amount, transaction_type,category
-        )
+        transaction_id = insert_transaction(session["user_id"], description, amount, transaction_type, category)
+
+        # Update open dashboards in place
+        if broker.has_subscribers(session["user_id"]):
+            broker.publish(session["user_id"], "transaction", db.execute("SELECT * FROM transactions WHERE id = ?", transaction_id)[0])
+            publish_dashboard_update(session["user_id"], category if transaction_type == "Expense" else None)
 
-        flash(translations[lang]["success_transaction"])
+        flash(get_catalog()["success_transaction"])
         return redirect("/")
     else:
         return render_template("add.html", transactions=transactions, categories=categories)
 
 
-@app.route("/delete_transaction", methods=["POST"])
+@bp.route("/delete_transaction", methods=["POST"])
 @login_required
 def delete_transaction():
     """Delete a user's transactions"""
 
     transaction_id = request.form.get("transaction_id")
-    lang = session.get("language", "en")
 
     # Delete specific user's transaction
     if transaction_id:
+        rows = db.execute(
+            "SELECT type, category FROM transactions WHERE id = ? AND user_id = ?", transaction_id, session["user_id"]
+        )
         db.execute(
             "DELETE FROM transactions WHERE id = ? AND user_id = ?", transaction_id, session["user_id"]
         )
-        flash(translations[lang]["delete_transaction"])
+        if rows:
+            broker.publish(session["user_id"], "transaction_deleted", {"id": int(transaction_id)})
+            publish_dashboard_update(session["user_id"], rows[0]["category"] if rows[0]["type"] == "Expense" else None)
+        flash(get_catalog()["delete_transaction"])
 
     return redirect(request.referrer or "/")
 
-@app.route("/history")
+@bp.route("/history")
 @login_required
 def history():
     """Show history of transactions with filters"""
 
-    user_id = session["user_id"]
-
     # Get form's filters (If they exist)
     month_filter = request.args.get("month") #YYYY-MM Format
     category_filter = request.args.get("category")
 
-    # Make the query's beginning
-    query = "SELECT * FROM transactions WHERE user_id = ?"
+    return render_template("history.html", **run_query(queries.history(session["user_id"], month_filter, category_filter)))
 
-    # Define the values that will take places of the ?
-    params = [user_id]
 
-    # Complemente the query based on the filter
-    if month_filter:
-        query += " AND strftime('%Y-%m', timestamp) = ?"
-        params.append(month_filter)
-
-    if category_filter:
-        query += " AND category = ?"
-        params.append(category_filter)
-
-    # It all is ordered based on the most recents
-    query += " ORDER BY timestamp DESC"
-
-    # Execute the final query
-    transactions = db.execute(query, *params) # The * is a splat operator
-
-    # Get all the categories for the dropdown list
-    categories = db.execute("SELECT name FROM categories WHERE user_id IS NULL OR user_id = ?", user_id)
-
-    return render_template("history.html", transactions=transactions, categories=categories)
-
-
-@app.route("/categories", methods=["GET", "POST"])
+@bp.route("/categories", methods=["GET", "POST"])
 @login_required
 def categories():
     """Show and manage user's new categories"""
 
-    lang = session.get("language", "en")
-
     if request.method == "POST":
 
         # Get user's new category
@@ -386,7 +629,7 @@ def categories():
         # Insert the new category
         db.execute("INSERT INTO categories (user_id, name) VALUES (?, ?)", session["user_id"], new_category)
 
-        flash(translations[lang]["added_category"])
+        flash(get_catalog()["added_category"])
         return redirect("/categories")
 
     else:
@@ -395,63 +638,43 @@ def categories():
         return render_template("categories.html", categories=user_categories)
 
 
-@app.route("/delete_category", methods = ["POST"])
+@bp.route("/delete_category", methods = ["POST"])
 @login_required
 def delete_category():
     """Delete a user's custom category"""
 
     category_id = request.form.get("category_id")
-    lang = session.get("language", "en")
 
 
     if category_id:
         db.execute("DELETE FROM categories WHERE id=? AND user_id=?", category_id, session["user_id"])
-        flash(translations[lang]["delete_category"])
+        flash(get_catalog()["delete_category"])
 
     return redirect("/categories")
 
 
-@app.route("/reports")
+@bp.route("/reports")
 @login_required
 def reports():
     """Show charts of expenses"""
+    return render_template("reports.html", **run_query(queries.reports(session["user_id"])))
 
-    # Get total of expenses per category on the actual month
-    current_month = datetime.now().strftime('%Y-%m') #"2025-10"
-    expenses_by_category = db.execute(
-        "SELECT category, SUM(amount) as total FROM transactions WHERE user_id = ? AND type = 'Expense' AND strftime('%Y-%m', timestamp) = ? GROUP BY category ORDER BY total DESC", session["user_id"], current_month
-    )
-
-    # Prepare data for Chart.js
-    labels = []
-    data = []
-    for row in expenses_by_category:
-        labels.append(row["category"])
-        data.append(row["total"])
-
-    return render_template("reports.html", labels=labels, data=data)
 
-
-@app.route("/budget", methods=["GET", "POST"])
+@bp.route("/budget", methods=["GET", "POST"])
 @login_required
 def budget():
     """Allow user to set monthly budgets for categories"""
 
-    lang = session.get("language", "en")
-
     if request.method == "POST":
-        category = request.form.get("category")
-        amount = request.form.get("amount")
         current_month = datetime.now().strftime('%Y-%m')
 
         # Validation
-        if not category or not amount:
-            return apology("invalid_budget", 400)
-        try:
-            amount = float(amount)
-            if amount < 0: raise ValueError
-        except ValueError:
-            return apology("invalid_value", 400)
+        error, values = validate_budget(request.form)
+        if error:
+            return apology(error, 400)
+
+        category = values["category"]
+        amount = values["amount"]
 
         # Verify if there already is a budget for this category/month
         existing_budget = db.execute(
@@ -468,8 +691,9 @@ def budget():
             db.execute(
                 "INSERT INTO budgets (user_id, category_name, amount, month) VALUES (?, ?, ?, ?)", session["user_id"], category, amount, current_month
             )
+        publish_dashboard_update(session["user_id"], category)
 
-        flash(translations[lang]["save_budget"])
+        flash(get_catalog()["save_budget"])
         return redirect("/budget")
 
     else:
@@ -487,59 +711,67 @@ def budget():
         return render_template("budget.html", budgets=budgets, categories=expense_categories)
 
 
-@app.route("/delete_budget", methods=["POST"])
+@bp.route("/budget_analytics")
+@login_required
+def budget_analytics_view():
+    """Show budgeted vs. actual spending per category over the last 12 or 24 months"""
+
+    months = 24 if request.args.get("months") == "24" else 12
+    current_month = datetime.now().strftime('%Y-%m')
+    rows = budget_analytics(current_app.config["DATABASE_URI"], session["user_id"], months, current_month, get_data_version(session["user_id"]))
+
+    # Group the months under each category for the template
+    analytics = {}
+    for row in rows:
+        analytics.setdefault(row["category"], []).append(row)
+
+    return render_template("budget_analytics.html", analytics=analytics, months=months)
+
+
+@bp.route("/delete_budget", methods=["POST"])
 @login_required
 def delete_budget():
     """Delete a user's budget"""
 
     budget_id = request.form.get("budget_id")
-    lang = session.get("language", "en")
 
 
     # Delete in the database
     if budget_id:
+        rows = db.execute(
+            "SELECT category_name, month FROM budgets WHERE id = ? AND user_id = ?", budget_id, session["user_id"]
+        )
         db.execute(
             "DELETE FROM budgets WHERE id = ? AND user_id = ?", budget_id, session["user_id"]
         )
-        flash(translations[lang]["delete_budget"])
+        if rows and rows[0]["month"] == datetime.now().strftime('%Y-%m'):
+            broker.publish(session["user_id"], "budget_deleted", {"category": rows[0]["category_name"]})
+        flash(get_catalog()["delete_budget"])
 
     return redirect("/budget")
 
 
-@app.route("/recurring", methods=["GET", "POST"])
+@bp.route("/recurring", methods=["GET", "POST"])
 @login_required
 def recurring():
     """Manage recurring transactions"""
 
     user_id = session["user_id"]
     transactions = ["Income", "Expense"]
-    lang = session.get("language", "en")
 
 
     if request.method == "POST":
-        amount = request.form.get("amount")
-        transaction_type = request.form.get("type")
-        description = request.form.get("description")
-        category = request.form.get("category")
-        day = request.form.get("day_of_month")
-
         # Validation
-        if not all([amount, transaction_type, description, category, day]):
-            return apology("missing_recurring", 400)
-        try:
-            amount = float(amount)
-            day = int(day)
-            if amount <= 0 or not (1 <= day <= 31):
-                raise ValueError
-        except ValueError:
-            return apology("invalid_recurring", 400)
+        error, values = validate_recurring(request.form)
+        if error:
+            return apology(error, 400)
 
         # Insert the new rule in db
         db.execute(
-            "INSERT INTO recurring_transactions (user_id, description, amount, type, category, day_of_month) VALUES (?, ?, ?, ?, ?, ?)", user_id, description, amount, transaction_type, category, day
+            "INSERT INTO recurring_transactions (user_id, description, amount, type, category, day_of_month) VALUES (?, ?, ?, ?, ?, ?)", user_id, values["description"], values["amount"], values["type"], values["category"], values["day_of_month"]
         )
 
-        flash(translations[lang]["save_recurring"])
+        flash(get_catalog()["save_recurring"])
 
         return redirect("/recurring")
 
@@ -554,22 +786,239 @@ def recurring():
         return render_template("recurring.html", recurring_trans=recurring_trans, categories=categories, transactions=transactions)
 
 
-@app.route("/delete_recurring", methods=["POST"])
+@bp.route("/delete_recurring", methods=["POST"])
 @login_required
 def delete_recurring():
     """Delete a user's recurring transaction rule"""
 
     recurring_id = request.form.get("recurring_id")
-    lang = session.get("language", "en")
 
     if recurring_id:
         db.execute(
             "DELETE FROM recurring_transactions WHERE id = ? AND user_id = ?", recurring_id, session["user_id"]
         )
-        flash(translations[lang]["delete_recurring"])
+        flash(get_catalog()["delete_recurring"])
 
     return redirect("/recurring")
 
 
+# JSON API (v1): batch create, update and delete, one database transaction per request
+
+# Largest number of items accepted in one batch request
+API_MAX_BATCH = 1000
+
+
+class InvalidItem(Exception):
+    """Raised by an API item handler to reject that item with a translation key."""
+
+    def __init__(self, error):
+        super().__init__(error)
+        self.error = error
+
+
+def api_error(error, code):
+    """Return a JSON error with its translated message"""
+    return jsonify(error=error, message=get_catalog().get(error, error)), code
+
+
+def api_login_required(f):
+    """Like login_required, but answers API clients with 401 instead of a redirect"""
+
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if session.get("user_id") is None:
+            return api_error("login_required", 401)
+        return f(*args, **kwargs)
+
+    return decorated_function
+
+
+def fetch_owned(connection, table, item, user_id):
+    """Return the user's row of table with the item's id, rejecting the item if there's none."""
+    row = connection.execute(f"SELECT * FROM {table} WHERE id = ? AND user_id = ?", (item.get("id"), user_id)).fetchone()
+    if row is None:
+        raise InvalidItem("not_found")
+    return dict(row)
+
+
+def parse_timestamp(value):
+    """Accept 'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM:SS' timestamps from API clients."""
+    for fmt in ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d"]:
+        try:
+            return datetime.strptime(value, fmt).strftime("%Y-%m-%d %H:%M:%S")
+        except (TypeError, ValueError):
+            pass
+    raise InvalidItem("invalid_timestamp")
+
+
+def api_create_transaction(connection, user_id, item):
+    error, values = validate_transaction(item)
+    if error:
+        raise InvalidItem(error)
+    timestamp = parse_timestamp(item["timestamp"]) if item.get("timestamp") else None
+
+    # Without a timestamp the row gets CURRENT_TIMESTAMP, as in the form
+    cursor = connection.execute(
+        "INSERT INTO transactions (user_id, description, amount, type, category, timestamp) VALUES (?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))", (user_id, values["description"], values["amount"], values["type"], values["category"], timestamp)
+    )
+    return {"id": cursor.lastrowid}
+
+
+def api_update_transaction(connection, user_id, item):
+    old = fetch_owned(connection, "transactions", item, user_id)
+    error, values = validate_transaction({**old, **item})
+    if error:
+        raise InvalidItem(error)
+    timestamp = parse_timestamp(item["timestamp"]) if item.get("timestamp") else old["timestamp"]
+
+    connection.execute(
+        "UPDATE transactions SET description = ?, amount = ?, type = ?, category = ?, timestamp = ? WHERE id = ?", (values["description"], values["amount"], values["type"], values["category"], timestamp, old["id"])
+    )
+    return {"id": old["id"]}
+
+
+def api_delete_transaction(connection, user_id, item):
+    old = fetch_owned(connection, "transactions", item, user_id)
+    connection.execute("DELETE FROM transactions WHERE id = ?", (old["id"],))
+    return {"id": old["id"]}
+
+
+def api_create_budget(connection, user_id, item):
+    error, values = validate_budget(item)
+    if error:
+        raise InvalidItem(error)
+    current_month = datetime.now().strftime('%Y-%m')
+
+    # Like the form, saving a category that already has a budget this month updates it
+    connection.execute(
+        "INSERT INTO budgets (user_id, category_name, amount, month) VALUES (?, ?, ?, ?) ON CONFLICT(user_id, category_name, month) DO UPDATE SET amount = excluded.amount", (user_id, values["category"], values["amount"], current_month)
+    )
+    row = connection.execute(
+        "SELECT id FROM budgets WHERE user_id = ? AND category_name = ? AND month = ?", (user_id, values["category"], current_month)
+    ).fetchone()
+    return {"id": row["id"]}
+
+
+def api_update_budget(connection, user_id, item):
+    old = fetch_owned(connection, "budgets", item, user_id)
+    error, values = validate_budget({"category": old["category_name"], "amount": old["amount"], **item})
+    if error:
+        raise InvalidItem(error)
+    connection.execute("UPDATE budgets SET category_name = ?, amount = ? WHERE id = ?", (values["category"], values["amount"], old["id"]))
+    return {"id": old["id"]}
+
+
+def api_delete_budget(connection, user_id, item):
+    old = fetch_owned(connection, "budgets", item, user_id)
+    connection.execute("DELETE FROM budgets WHERE id = ?", (old["id"],))
+    return {"id": old["id"]}
+
+
+def api_create_recurring(connection, user_id, item):
+    error, values = validate_recurring(item)
+    if error:
+        raise InvalidItem(error)
+    cursor = connection.execute(
+        "INSERT INTO recurring_transactions (user_id, description, amount, type, category, day_of_month) VALUES (?, ?, ?, ?, ?, ?)", (user_id, values["description"], values["amount"], values["type"], values["category"], values["day_of_month"])
+    )
+    return {"id": cursor.lastrowid}
+
+
+def api_update_recurring(connection, user_id, item):
+    old = fetch_owned(connection, "recurring_transactions", item, user_id)
+    error, values = validate_recurring({**old, **item})
+    if error:
+        raise InvalidItem(error)
+    connection.execute(
+        "UPDATE recurring_transactions SET description = ?, amount = ?, type = ?, category = ?, day_of_month = ? WHERE id = ?", (values["description"], values["amount"], values["type"], values["category"], values["day_of_month"], old["id"])
+    )
+    return {"id": old["id"]}
+
+
+def api_delete_recurring(connection, user_id, item):
+    old = fetch_owned(connection, "recurring_transactions", item, user_id)
+    connection.execute("DELETE FROM recurring_transactions WHERE id = ?", (old["id"],))
+    return {"id": old["id"]}
+
+
+# Item handlers of each API resource, and whether it changes dashboard data
+api_resources = {
+    "transactions": ({"create": api_create_transaction, "update": api_update_transaction, "delete": api_delete_transaction}, True),
+    "budgets": ({"create": api_create_budget, "update": api_update_budget, "delete": api_delete_budget}, True),
+    "recurring": ({"create": api_create_recurring, "update": api_update_recurring, "delete": api_delete_recurring}, False),
+}
+
+
+@bp.route("/api/v1/<resource>/batch", methods=["POST"])
+@api_login_required
+def api_batch(resource):
+    """
+    Create, update and delete many rows in one request and one database transaction.
+
+    Body: {"create": [{...}], "update": [{"id": 1, ...}], "delete": [{"id": 2}]}.
+    Every item gets a result in the same position; an item that fails is
+    rolled back alone and the rest of the batch still commits.
+    """
+
+    if resource not in api_resources:
+        return api_error("not_found", 404)
+    handlers, changes_dashboard = api_resources[resource]
+
+    payload = request.get_json(silent=True)
+    # Only the resource's own actions, each a list; a misspelled action must not be silently ignored
+    if not isinstance(payload, dict) or not payload.keys() <= handlers.keys() or not all(isinstance(items, list) for items in payload.values()):
+        return api_error("invalid_json", 400)
+    if sum(len(payload.get(action, [])) for action in handlers) > API_MAX_BATCH:
+        return api_error("batch_too_large", 413)
+
+    user_id = session["user_id"]
+    catalog = get_catalog()
+    results = {}
+    changed = False
+
+    # The batch runs on its own connection so BEGIN/COMMIT only cover this request's statements
+    connection = sqlite3.connect(current_app.config["DATABASE_URI"], uri=True, isolation_level=None, timeout=30)
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA foreign_keys=ON")
+    try:
+        connection.execute("BEGIN IMMEDIATE")
+        for action, handler in handlers.items():
+            results[action] = []
+            for item in payload.get(action, []):
+                if not isinstance(item, dict):
+                    item = {"id": item} # deletes may list bare ids
+                connection.execute("SAVEPOINT item")
+                try:
+                    result = handler(connection, user_id, item)
+                except InvalidItem as e:
+                    connection.execute("ROLLBACK TO item")
+                    results[action].append({"ok": False, "error": e.error, "message": catalog.get(e.error, e.error)})
+                except sqlite3.Error as e:
+                    connection.execute("ROLLBACK TO item")
+                    # The sqlite message names tables and constraints: log it, answer with the generic one
+                    current_app.logger.warning("batch %s %s failed: %s", resource, action, e)
+                    results[action].append({"ok": False, "error": "database_error", "message": catalog["database_error"]})
+                else:
+                    results[action].append({"ok": True, **result})
+                    changed = True
+                connection.execute("RELEASE item")
+
+        connection.execute("COMMIT")
+    except Exception:
+        if connection.in_transaction:
+            connection.execute("ROLLBACK")
+        raise
+    finally:
+        connection.close()
+
+    if changed and changes_dashboard:
+        publish_dashboard_update(user_id)
+
+    return jsonify(results=results)
+
+
+app = create_app()
+
+
 if __name__ == "__main__":
     app.run()
\ No newline at end of file
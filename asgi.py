@@ -0,0 +1,162 @@
+import asyncio
+import io
+import os
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from concurrent.futures import ThreadPoolExecutor
+from flask import Response, redirect, render_template, request, session
+
+from app import app, broker, close_resources, get_resource, open_database, writer
+from asyncdb import AsyncSQL
+from events import format_event
+from helpers import localize_event
+import queries
+
+
+# Async (ASGI) serving mode, run with: uvicorn asgi:application
+# The read routes and /events below are async views over a pooled aiosqlite connection,
+# every other route is served by the regular Flask app on a pool of threads.
+adb = AsyncSQL(app.config["DATABASE_URI"], pool_size=int(os.environ.get("MYBUDGET_ASYNC_POOL", 8)))
+wsgi_executor = ThreadPoolExecutor(max_workers=int(os.environ.get("MYBUDGET_WSGI_THREADS", 32)), thread_name_prefix="wsgi")
+
+
+class ThreadPoolWsgiToAsgiInstance(WsgiToAsgiInstance):
+    # asgiref runs the WSGI app thread-sensitively, i.e. every request on one shared thread
+    run_wsgi_app = sync_to_async(WsgiToAsgiInstance.__dict__["run_wsgi_app"].func, thread_sensitive=False, executor=wsgi_executor)
+
+
+class ThreadPoolWsgiToAsgi(WsgiToAsgi):
+    """WsgiToAsgi that serves concurrent requests on wsgi_executor's threads."""
+
+    async def __call__(self, scope, receive, send):
+        await ThreadPoolWsgiToAsgiInstance(self.wsgi_application, self.duplicate_header_limit)(scope, receive, send)
+
+    def build_environ(self, scope):
+        """WSGI environ of a bodyless request, built the same way as for the routes served on threads."""
+        instance = ThreadPoolWsgiToAsgiInstance(self.wsgi_application, self.duplicate_header_limit)
+        instance.scope = scope
+        return instance.build_environ(scope, io.BytesIO())
+
+
+wsgi = ThreadPoolWsgiToAsgi(app)
+
+
+async def execute_batched(sql, *args):
+    """Send transaction inserts through the group-commit writer when it's enabled, like app.run_query()."""
+    if writer:
+        return await asyncio.wrap_future(writer.submit(sql, *args))
+    return await adb.execute(sql, *args)
+
+
+async def run_query(plan):
+    """Run a plan from queries.py on the async connection pool."""
+    return await queries.run_async(plan, adb.execute, execute_batched)
+
+
+async def index():
+    """Show user's financial dashboard"""
+    return render_template("index.html", **await run_query(queries.dashboard(session["user_id"])))
+
+
+async def history():
+    """Show history of transactions with filters"""
+    return render_template("history.html", **await run_query(queries.history(session["user_id"], request.args.get("month"), request.args.get("category"))))
+
+
+async def reports():
+    """Show charts of expenses"""
+    return render_template("reports.html", **await run_query(queries.reports(session["user_id"])))
+
+
+async def events(receive, send):
+    """Stream dashboard updates (Server-Sent Events) from the event loop, without holding a thread per open dashboard"""
+
+    user_id = session["user_id"]
+    subscription = broker.subscribe_async(user_id)
+    disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+    try:
+        response = app.process_response(Response(mimetype="text/event-stream", headers={"X-Accel-Buffering": "no"}))
+        await send(response_start(response))
+        await send({"type": "http.response.body", "body": b"retry: 5000\n\n", "more_body": True})
+
+        while True:
+            update = asyncio.ensure_future(subscription.get())
+            done, _ = await asyncio.wait([update, disconnected], timeout=15, return_when=asyncio.FIRST_COMPLETED)
+            if disconnected in done:
+                update.cancel()
+                return
+            if update in done:
+                event, data = update.result()
+                chunk = format_event(event, localize_event(data))
+            else:
+                update.cancel()
+                # Keep idle connections from being closed by proxies
+                chunk = ": keep-alive\n\n"
+            await send({"type": "http.response.body", "body": chunk.encode(), "more_body": True})
+    finally:
+        disconnected.cancel()
+        broker.unsubscribe(user_id, subscription)
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+def response_start(response):
+    """ASGI message starting a response with the status and headers of a Flask response"""
+    return {
+        "type": "http.response.start",
+        "status": response.status_code,
+        "headers": [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in response.headers.to_wsgi_list()],
+    }
+
+
+# Async views, all login required
+async_routes = {
+    "/": index,
+    "/history": history,
+    "/reports": reports,
+    "/events": events,
+}
+
+
+async def application(scope, receive, send):
+    """ASGI entry point"""
+
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                # Creates the database from schema.sql if needed before the async views use it
+                with app.app_context():
+                    get_resource("db", open_database)
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await adb.close()
+                # uvicorn re-raises SIGTERM after shutdown, so atexit handlers never get to stop these
+                close_resources(app)
+                wsgi_executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    view = async_routes.get(scope["path"]) if scope["type"] == "http" and scope["method"] == "GET" else None
+    if view is None:
+        return await wsgi(scope, receive, send)
+
+    # Run the view inside a Flask request context so session, templates and filters behave as in app.py
+    with app.request_context(wsgi.build_environ(scope)):
+        if session.get("user_id") is None:
+            response = redirect("/login")
+        elif view is events:
+            # Streams its own response until the client goes away
+            return await events(receive, send)
+        else:
+            response = app.make_response(await view())
+
+        # Runs after_request and saves the session (flashed messages, language)
+        response = app.process_response(response)
+
+    await send(response_start(response))
+    await send({"type": "http.response.body", "body": response.get_data()})
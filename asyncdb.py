@@ -0,0 +1,49 @@
+import asyncio
+
+import aiosqlite
+
+
+class AsyncSQL:
+    """Non-blocking counterpart of cs50.SQL over a bounded pool of aiosqlite connections."""
+
+    def __init__(self, database_uri, pool_size=8):
+        self.database_uri = database_uri
+        self.pool_size = pool_size
+        self._pool = None
+        self._opened = 0
+
+    async def _acquire(self):
+        if self._pool is None:
+            self._pool = asyncio.Queue()
+
+        # Open connections lazily, up to pool_size, then wait for a free one
+        if self._pool.empty() and self._opened < self.pool_size:
+            self._opened += 1
+            connection = await aiosqlite.connect(self.database_uri, uri=True, isolation_level=None, timeout=30)
+            connection.row_factory = aiosqlite.Row
+            await connection.execute("PRAGMA foreign_keys=ON")
+            return connection
+        return await self._pool.get()
+
+    async def execute(self, sql, *args):
+        """Run one statement. Like cs50.SQL, returns rows for SELECT, the new id for INSERT and the row count otherwise."""
+        connection = await self._acquire()
+        try:
+            async with connection.execute(sql, args) as cursor:
+                command = sql.lstrip().split(None, 1)[0].upper()
+                if command == "SELECT":
+                    return [dict(row) for row in await cursor.fetchall()]
+                if command == "INSERT":
+                    return cursor.lastrowid
+                return cursor.rowcount
+        finally:
+            self._pool.put_nowait(connection)
+
+    async def close(self):
+        """Close every pooled connection."""
+        if self._pool is None:
+            return
+        while not self._pool.empty():
+            connection = self._pool.get_nowait()
+            await connection.close()
+            self._opened -= 1
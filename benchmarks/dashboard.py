@@ -0,0 +1,90 @@
+"""
+Time the dashboard (GET /) end to end on a long history.
+
+Usage: python benchmarks/dashboard.py [--years 5] [--per-day 4] [--runs 20]
+
+Builds an in-memory database with one user, --per-day expenses a day over the
+last --years years, a few budgets and monthly recurring rules, then reports
+the time of the spending forecast query and of the whole dashboard request.
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+from datetime import date, timedelta
+from flask import render_template
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db, run_query # noqa: E402
+import queries # noqa: E402
+
+
+CATEGORIES = ["Food", "Housing", "Leisure", "Transportation"]
+
+
+def seed(years, per_day):
+    db.execute("INSERT INTO users (username, hash) VALUES ('bench', 'x')")
+    user_id = db.execute("SELECT id FROM users WHERE username = 'bench'")[0]["id"]
+
+    today = date.today()
+    random.seed(0)
+    rows = []
+    for days_ago in range(years * 365, 0, -1):
+        day = today - timedelta(days=days_ago)
+        for i in range(per_day):
+            rows.append((user_id, f"d{i}", round(random.uniform(5, 80), 2), "Expense", random.choice(CATEGORIES), f"{day.isoformat()} {8 + i:02d}:00:00"))
+
+    # One multi-row INSERT per chunk keeps seeding fast
+    for start in range(0, len(rows), 100):
+        chunk = rows[start:start + 100]
+        db.execute(
+            "INSERT INTO transactions (user_id, description, amount, type, category, timestamp) VALUES " + ", ".join(["(?, ?, ?, ?, ?, ?)"] * len(chunk)),
+            *[value for row in chunk for value in row]
+        )
+
+    month = today.strftime("%Y-%m")
+    for category in CATEGORIES:
+        db.execute("INSERT INTO budgets (user_id, category_name, amount, month) VALUES (?, ?, 500, ?)", user_id, category, month)
+    db.execute("INSERT INTO recurring_transactions (user_id, description, amount, type, category, day_of_month) VALUES (?, 'Rent', 900, 'Expense', 'Housing', 5)", user_id)
+    return user_id, len(rows)
+
+
+def best_of(runs, fn):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000, sorted(times)[len(times) // 2] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--per-day", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    logging.getLogger("cs50").disabled = True
+    app = create_app({"DATABASE": ":memory:"})
+    with app.app_context():
+        user_id, count = seed(args.years, args.per_day)
+        print(f"{count} transactions")
+
+        run_query(queries.dashboard(user_id)) # adds this month's recurring transaction once
+
+        forecast = best_of(args.runs, lambda: run_query(queries.spending_forecast(user_id, {})))
+        print(f"forecast (query + NumPy)  best {forecast[0]:6.1f} ms  median {forecast[1]:6.1f} ms")
+
+        with app.test_request_context("/"):
+            dashboard = best_of(args.runs, lambda: render_template("index.html", **run_query(queries.dashboard(user_id))))
+        print(f"dashboard (all queries + render)  best {dashboard[0]:6.1f} ms  median {dashboard[1]:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
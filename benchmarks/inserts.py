@@ -0,0 +1,88 @@
+"""
+Throughput of concurrent transaction inserts with and without the group-commit writer.
+
+Usage: python benchmarks/inserts.py [--threads 32] [--inserts 100] [--mode direct|group|both]
+
+Each run gets a fresh database file in a temporary directory with one user,
+then --threads threads each call insert_transaction() --inserts times, as
+add() does. "direct" runs with GROUP_COMMIT off (db.execute per insert),
+"group" with it on (inserts batched by the GroupCommitWriter).
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import close_resources, create_app, db, insert_transaction # noqa: E402
+
+
+CATEGORIES = ["Food", "Housing", "Leisure", "Transportation"]
+
+
+def run(group_commit, threads, inserts):
+    """Return (rows/s, p50 ms, p99 ms, errors) of threads x inserts concurrent inserts."""
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_app({"DATABASE": os.path.join(directory, "budget.db"), "GROUP_COMMIT": group_commit})
+        with app.app_context():
+            db.execute("INSERT INTO users (username, hash) VALUES ('bench', 'x')")
+            user_id = db.execute("SELECT id FROM users WHERE username = 'bench'")[0]["id"]
+            insert_transaction(user_id, "warm up", 1, "Expense", "Food") # opens the pool and starts the writer
+
+        latencies = []
+        errors = []
+        ready = threading.Barrier(threads + 1)
+
+        def client(n):
+            with app.app_context():
+                ready.wait()
+                for i in range(inserts):
+                    start = time.perf_counter()
+                    try:
+                        insert_transaction(user_id, f"t{n}-{i}", 10 + i % 90, "Expense", CATEGORIES[i % len(CATEGORIES)])
+                    except Exception as e:
+                        errors.append(e)
+                    latencies.append(time.perf_counter() - start)
+
+        workers = [threading.Thread(target=client, args=(n,)) for n in range(threads)]
+        for worker in workers:
+            worker.start()
+        ready.wait()
+        start = time.perf_counter()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+
+        with app.app_context():
+            stored = db.execute("SELECT COUNT(*) as n FROM transactions")[0]["n"] - 1
+        close_resources(app)
+
+    if stored != threads * inserts - len(errors):
+        raise RuntimeError(f"{stored} rows stored for {threads * inserts - len(errors)} successful inserts")
+
+    latencies.sort()
+    return stored / elapsed, latencies[len(latencies) // 2] * 1000, latencies[int(len(latencies) * 0.99)] * 1000, len(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--inserts", type=int, default=100)
+    parser.add_argument("--mode", choices=["direct", "group", "both"], default="both")
+    args = parser.parse_args()
+
+    logging.getLogger("cs50").disabled = True
+    modes = {"direct": False, "group": True}
+    for mode in modes if args.mode == "both" else [args.mode]:
+        rate, p50, p99, errors = run(modes[mode], args.threads, args.inserts)
+        print(f"{mode:6} {args.threads} threads x {args.inserts}  {rate:7.0f} rows/s  p50 {p50:6.1f} ms  p99 {p99:6.1f} ms  errors {errors}")
+
+
+if __name__ == "__main__":
+    main()
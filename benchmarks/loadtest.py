@@ -0,0 +1,143 @@
+"""
+Load test of the read routes under the WSGI server (flask run --with-threads) and the ASGI one (uvicorn asgi:application).
+
+Usage: python benchmarks/loadtest.py [--clients 64] [--requests 10] [--transactions 200] [--mode wsgi|asgi|both] [--paths / "/history?category=Food" ...]
+
+Each server gets a fresh database in a temporary directory with one user and
+--transactions transactions (added through the JSON batch API), then --clients
+threads each request every path --requests times with that user's session.
+"""
+
+import argparse
+import http.cookiejar
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+from datetime import datetime, timedelta
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVERS = {
+    "wsgi": [sys.executable, "-m", "flask", "--app", "app", "run", "--with-threads", "--port", "{port}"],
+    "asgi": [sys.executable, "-m", "uvicorn", "asgi:application", "--port", "{port}", "--log-level", "warning"],
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def seed(base, transactions):
+    """Register a user, add its transactions and return the session cookie header."""
+
+    jar = http.cookiejar.CookieJar()
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar))
+    form = urllib.parse.urlencode({"username": "loadtest", "password": "loadtest", "confirmation": "loadtest"}).encode()
+    opener.open(f"{base}/register", form)
+
+    today = datetime.now()
+    items = [{
+        "amount": 10 + i % 90,
+        "type": "Income" if i % 10 == 0 else "Expense",
+        "category": ["Food", "Housing", "Leisure", "Transportation"][i % 4],
+        "description": f"d{i}",
+        "timestamp": (today - timedelta(days=i % 60)).strftime("%Y-%m-%d"),
+    } for i in range(transactions)]
+    for start in range(0, len(items), 1000):
+        request = urllib.request.Request(
+            f"{base}/api/v1/transactions/batch", json.dumps({"create": items[start:start + 1000]}).encode(), {"Content-Type": "application/json"}
+        )
+        opener.open(request).read()
+
+    return "; ".join(f"{cookie.name}={cookie.value}" for cookie in jar)
+
+
+def hammer(url, cookie, clients, requests):
+    """Request url from clients threads, requests times each. Returns (req/s, p50, p99, errors)."""
+
+    latencies = []
+    errors = []
+
+    def client():
+        for _ in range(requests):
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(urllib.request.Request(url, headers={"Cookie": cookie})) as response:
+                    response.read()
+                    # Redirects to /login would mean the session was lost
+                    if response.status != 200 or response.url != url:
+                        raise RuntimeError(f"{response.status} {response.url}")
+            except Exception as e:
+                errors.append(e)
+            latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return clients * requests / elapsed, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)], len(errors)
+
+
+def run(mode, args):
+    with tempfile.TemporaryDirectory() as directory:
+        port = free_port()
+        env = dict(os.environ, MYBUDGET_DATABASE=os.path.join(directory, "budget.db"), PYTHONPATH=ROOT)
+        command = [part.format(port=port) for part in SERVERS[mode]]
+
+        # Run from the temporary directory so the session files land there too
+        server = subprocess.Popen(command, cwd=directory, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_for(port)
+            base = f"http://127.0.0.1:{port}"
+            cookie = seed(base, args.transactions)
+            for path in args.paths:
+                hammer(base + path, cookie, 4, 2) # warm up
+                rate, p50, p99, errors = hammer(base + path, cookie, args.clients, args.requests)
+                print(f"{mode:5} {path:23} {rate:7.0f} req/s  p50 {p50 * 1000:6.0f} ms  p99 {p99 * 1000:6.0f} ms  errors {errors}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--transactions", type=int, default=200)
+    parser.add_argument("--mode", choices=["wsgi", "asgi", "both"], default="both")
+    parser.add_argument("--paths", nargs="+", default=["/", "/history", "/history?category=Food", "/reports"])
+    args = parser.parse_args()
+
+    for mode in ["wsgi", "asgi"] if args.mode == "both" else [args.mode]:
+        run(mode, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Time template rendering per language, without the database.
+
+Usage: python benchmarks/render.py [--rows 500] [--renders 50] [--runs 5]
+
+Renders history.html with --rows transactions, budget.html and reports.html
+from fixed data in each language, and reports the best time per render.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from flask import render_template, session
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app # noqa: E402
+from i18n import catalogs # noqa: E402
+
+
+CATEGORIES = ["Food", "Housing", "Leisure", "Salary", "Transportation"]
+
+
+def pages(rows):
+    transactions = [{
+        "id": i,
+        "timestamp": f"2025-10-{i % 28 + 1:02d} 12:00:00",
+        "type": "Expense",
+        "amount": i,
+        "category": CATEGORIES[i % len(CATEGORIES)],
+        "description": f"d{i}",
+    } for i in range(rows)]
+    categories = [{"name": name} for name in CATEGORIES]
+    budgets = [{"id": i, "category_name": name, "amount": 500} for i, name in enumerate(CATEGORIES)]
+
+    return [
+        ("history.html", dict(transactions=transactions, categories=categories)),
+        ("budget.html", dict(budgets=budgets, categories=categories)),
+        ("reports.html", dict(labels=CATEGORIES, data=[100] * len(CATEGORIES), balance_days=["2025-10-01"] * rows, balance_data=list(range(rows)))),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--renders", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app({"DATABASE": ":memory:"})
+    for lang in catalogs:
+        for page, values in pages(args.rows):
+            with app.test_request_context("/"):
+                session["language"] = lang
+                session["user_id"] = 1
+                render_template(page, **values) # compile and cache the template first
+
+                best = float("inf")
+                for _ in range(args.runs):
+                    start = time.perf_counter()
+                    for _ in range(args.renders):
+                        render_template(page, **values)
+                    best = min(best, (time.perf_counter() - start) / args.renders)
+            print(f"{lang} {page:13} {best * 1000:7.3f} ms/render")
+
+
+if __name__ == "__main__":
+    main()
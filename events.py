@@ -0,0 +1,76 @@
+import asyncio
+import json
+import queue
+import threading
+
+
+class AsyncSubscription:
+    """A stream read by asyncio code (asgi.py); events may be published to it from any thread."""
+
+    def __init__(self, max_queued):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=max_queued)
+
+    def put_nowait(self, item):
+        self.loop.call_soon_threadsafe(self._put, item)
+
+    def _put(self, item):
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            pass
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class EventBroker:
+    """Fan out small dashboard updates to every open event stream of a user."""
+
+    def __init__(self, max_queued=100):
+        self.max_queued = max_queued
+        self._subscribers = {} # user_id -> set of queues, one per open stream
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        """Register a new stream for user_id and return the queue it reads from."""
+        subscription = queue.Queue(maxsize=self.max_queued)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def subscribe_async(self, user_id):
+        """Like subscribe(), for a stream served on the running event loop. Returns an AsyncSubscription."""
+        subscription = AsyncSubscription(self.max_queued)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def has_subscribers(self, user_id):
+        """True if user_id has an open stream, so publishers can skip building events nobody reads."""
+        with self._lock:
+            return bool(self._subscribers.get(user_id))
+
+    def unsubscribe(self, user_id, subscription):
+        """Forget a stream once its client disconnects."""
+        with self._lock:
+            subscriptions = self._subscribers.get(user_id)
+            if subscriptions:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscribers[user_id]
+
+    def publish(self, user_id, event, data):
+        """Send an event to every open stream of user_id; streams that fell behind miss it."""
+        with self._lock:
+            subscriptions = list(self._subscribers.get(user_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.put_nowait((event, data))
+            except (queue.Full, RuntimeError): # RuntimeError: the stream's event loop is closed
+                pass
+
+
+def format_event(event, data):
+    """Serialize an event in the Server-Sent Events wire format."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
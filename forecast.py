@@ -0,0 +1,74 @@
+import numpy as np
+
+from calendar import monthrange
+from datetime import date
+
+
+# How far back the daily spend curves look, and how fast older days fade out
+HISTORY_DAYS = 5 * 366
+HALF_LIFE_DAYS = 90
+
+
+def add_months(day, months):
+    """Return the first day of the month `months` after day's month."""
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def forecast_spending(expense_rows, rules, spent_map, today, months=3):
+    """
+    Project expenses per category for the end of this month and the next `months` months.
+
+    expense_rows: {"category", "offsets", "amounts"}, one row per category with its expenses as
+    comma-separated lists (offset = days since today - HISTORY_DAYS), recurring transactions left out.
+    rules: expense recurring rules as {"category", "amount", "last_added"}.
+    spent_map: category -> amount already spent this month.
+
+    Returns (labels, projections) where labels are the months as date objects and
+    projections maps each category to one projected total per month.
+    """
+
+    categories = sorted({row["category"] for row in expense_rows} | {rule["category"] for rule in rules} | set(spent_map))
+    if not categories:
+        return [], {}
+    index = {category: i for i, category in enumerate(categories)}
+
+    # Daily totals as a (categories x days) matrix, today excluded since it isn't over yet
+    spend = np.zeros((len(categories), HISTORY_DAYS))
+    for row in expense_rows:
+        offsets = np.array(row["offsets"].split(","), dtype=int)
+        amounts = np.array(row["amounts"].split(","), dtype=float)
+        valid = (offsets >= 0) & (offsets < HISTORY_DAYS)
+        np.add.at(spend[index[row["category"]]], offsets[valid], amounts[valid])
+
+    # Exponentially weighted daily rate, counted only from the first day with any spending
+    age = np.arange(HISTORY_DAYS, 0, -1)
+    weights = 0.5 ** (age / HALF_LIFE_DAYS)
+    active = spend.any(axis=0)
+    if active.any():
+        weights[:np.argmax(active)] = 0
+        rate = spend @ weights / weights.sum()
+    else:
+        rate = np.zeros(len(categories))
+
+    # Recurring expenses: every rule each month, plus the ones not yet added this month
+    current_month = today.strftime('%Y-%m')
+    monthly_recurring = np.zeros(len(categories))
+    pending_recurring = np.zeros(len(categories))
+    for rule in rules:
+        monthly_recurring[index[rule["category"]]] += float(rule["amount"])
+        if rule["last_added"] != current_month:
+            pending_recurring[index[rule["category"]]] += float(rule["amount"])
+
+    spent = np.array([float(spent_map.get(category, 0)) for category in categories])
+    # spent already includes today's expenses, so only the days after today are still to come
+    remaining_days = monthrange(today.year, today.month)[1] - today.day
+
+    labels = [add_months(today, n) for n in range(months + 1)]
+    month_days = np.array([monthrange(label.year, label.month)[1] for label in labels[1:]])
+
+    projections = np.empty((len(categories), months + 1))
+    projections[:, 0] = spent + rate * remaining_days + pending_recurring
+    projections[:, 1:] = np.outer(rate, month_days) + monthly_recurring[:, None]
+
+    return labels, {category: projections[i].tolist() for category, i in index.items()}
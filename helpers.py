@@ -1,15 +1,12 @@
-import locale
-
 from datetime import datetime
 from flask import redirect, render_template, session
 from functools import wraps
-from translations import translations
+from i18n import get_catalog, get_lang
 
 
 def apology(message, code=400):
     """Render message as an apology to user."""
-    lang = session.get("language", "en")
-    translated_message = translations[lang].get(message, message)
+    translated_message = get_catalog().get(message, message)
     return render_template("apology.html", top=code, bottom=translated_message), code
 
 
@@ -31,7 +28,7 @@ def login_required(f):
 
 def format_currency(value):
     """Format value as currency based on the current language."""
-    lang = session.get("language", "en")
+    lang = get_lang()
 
     try:
         value = float(value)
@@ -62,9 +59,24 @@ def format_date(value):
             except ValueError:
                 return value
 
-    lang = session.get("language", "en")
+    lang = get_lang()
 
     if lang == "pt":
         return date_obj.strftime('%d/%m/%Y')
     else:
         return date_obj.strftime('%m/%d/%Y')
+
+
+def localize_event(data):
+    """Add display strings (currency, date, translated labels) to a dashboard event for the current language."""
+    localized = dict(data)
+
+    for key in ["income", "expense", "balance", "budgeted", "spent", "amount"]:
+        if key in data:
+            localized[key + "_display"] = format_currency(data[key])
+    if "timestamp" in data:
+        localized["timestamp_display"] = format_date(data["timestamp"])
+    if "category" in data:
+        localized["category_display"] = get_catalog().get(data["category"], data["category"])
+
+    return localized
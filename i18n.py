@@ -0,0 +1,87 @@
+import re
+
+from flask import g, has_request_context, session
+from flask.templating import Environment
+from jinja2 import BaseLoader, TemplateNotFound, TemplateSyntaxError
+from markupsafe import escape
+from types import MappingProxyType
+
+from translations import translations
+
+
+# {{ t['key'] }} with a literal key, the form resolved when a template is compiled
+STATIC_KEY = re.compile(r"""\{\{\s*t\[\s*(['"])(\w+)\1\s*\]\s*\}\}""")
+
+
+def compile_catalogs(translations):
+    """Freeze each language's translations, failing if any language is missing a key another one has."""
+
+    all_keys = set().union(*(catalog.keys() for catalog in translations.values()))
+    missing = {lang: sorted(all_keys - catalog.keys()) for lang, catalog in translations.items()}
+    missing = {lang: keys for lang, keys in missing.items() if keys}
+    if missing:
+        raise ValueError(f"missing translations: {missing}")
+
+    return MappingProxyType({lang: MappingProxyType(dict(catalog)) for lang, catalog in translations.items()})
+
+
+# Built once at startup
+catalogs = compile_catalogs(translations)
+
+
+def get_lang():
+    """Return the current request's language, read from the session once per request."""
+    if not has_request_context():
+        return "en"
+    if "lang" not in g:
+        g.lang = session.get("language", "en")
+    return g.lang
+
+
+def get_catalog():
+    """Return the current request's translation table."""
+    return catalogs[get_lang()]
+
+
+def resolve_static_keys(source, catalog, name):
+    """Replace every {{ t['key'] }} in a template's source with its escaped translation."""
+
+    def replace(match):
+        key = match.group(2)
+        if key not in catalog:
+            raise TemplateSyntaxError(f"missing translation {key!r}", source.count("\n", 0, match.start()) + 1, name)
+        return str(escape(catalog[key]))
+
+    return STATIC_KEY.sub(replace, source)
+
+
+class CatalogLoader(BaseLoader):
+    """Load "<lang>/<template>" as the template with its static translation keys already filled in."""
+
+    def __init__(self, loader):
+        self.loader = loader
+
+    def get_source(self, environment, template):
+        lang, _, name = template.partition("/")
+        if lang not in catalogs:
+            raise TemplateNotFound(template)
+        source, filename, uptodate = self.loader.get_source(environment, name)
+        return resolve_static_keys(source, catalogs[lang], template), filename, uptodate
+
+    def list_templates(self):
+        return [f"{lang}/{name}" for lang in catalogs for name in self.loader.list_templates()]
+
+
+class TranslatedEnvironment(Environment):
+    """Jinja environment that compiles and caches every template once per language."""
+
+    def __init__(self, app, **options):
+        super().__init__(app, **options)
+        self.loader = CatalogLoader(self.loader)
+
+    def get_template(self, name, parent=None, globals=None):
+        # Templates (and the layouts they extend) are looked up in the current request's language
+        if isinstance(name, str) and name.partition("/")[0] not in catalogs:
+            lang = parent.partition("/")[0] if parent else get_lang()
+            name = f"{lang}/{name}"
+        return super().get_template(name, None, globals)
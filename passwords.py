@@ -0,0 +1,113 @@
+import multiprocessing
+import threading
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+
+class HasherBusy(Exception):
+    """Raised when every hashing slot is taken and the request should be rejected."""
+
+
+def normalize_method(method):
+    """Spell out werkzeug's defaults so the method matches the prefix of a stored hash."""
+    parts = method.split(":")
+    if parts[0] == "scrypt" and len(parts) == 1:
+        return "scrypt:32768:8:1"
+    if parts[0] == "pbkdf2":
+        if len(parts) == 1:
+            parts.append("sha256")
+        if len(parts) == 2:
+            parts.append(str(DEFAULT_PBKDF2_ITERATIONS))
+    return ":".join(parts)
+
+
+def pool_context():
+    """
+    Start method for the hashing processes. Forked workers would inherit the server's
+    sockets (and keep its port bound if the server dies), so start them from a clean
+    forkserver process, or spawn them where forkserver isn't available.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class PasswordHasher:
+    """Run password hashing on a bounded process pool, away from the request threads."""
+
+    def __init__(self, method="scrypt", workers=2, max_pending=16):
+        self.method = normalize_method(method)
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pool = None
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.pending = 0
+        self.rejected = 0
+        self.count = 0
+        self.total_seconds = 0.0
+
+    def _run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise HasherBusy()
+            self.pending += 1
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=pool_context())
+            # close() may clear self._pool as soon as the lock is released
+            pool = self._pool
+
+        start = time.perf_counter()
+        try:
+            return pool.submit(fn, *args).result()
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.pending -= 1
+                self.count += 1
+                self.total_seconds += elapsed
+
+    def hash(self, password):
+        """Return a new hash of password using the configured method."""
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        """Check password against a stored hash."""
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True if the stored hash was made with different parameters than the configured ones."""
+        return pwhash.split("$", 1)[0] != self.method
+
+    def close(self):
+        """Stop the worker processes; the next hash starts them again."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+    def metrics(self):
+        """Return hashing metrics in Prometheus text format."""
+        with self._lock:
+            lines = [
+                "# TYPE password_hash_queue_depth gauge",
+                f"password_hash_queue_depth {self.pending}",
+                "# TYPE password_hash_rejected_total counter",
+                f"password_hash_rejected_total {self.rejected}",
+                "# TYPE password_hash_seconds summary",
+                f"password_hash_seconds_count {self.count}",
+                f"password_hash_seconds_sum {self.total_seconds:.6f}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+def hasher_from_config(config):
+    """Build the app's hasher from its HASH_METHOD, HASH_WORKERS and HASH_QUEUE settings."""
+    return PasswordHasher(
+        method=config["HASH_METHOD"],
+        workers=config["HASH_WORKERS"],
+        max_pending=config["HASH_QUEUE"],
+    )
@@ -0,0 +1,252 @@
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from forecast import HISTORY_DAYS, add_months, forecast_spending
+from i18n import get_catalog
+
+
+# Queries and computations shared by the Flask views (app.py) and the async views (asgi.py).
+# Each function is a generator that yields the statements it needs and gets their results back,
+# so the same code runs on cs50.SQL with run() and on AsyncSQL with run_async().
+
+# batched statements are inserts that may go through the group-commit writer
+Statement = namedtuple("Statement", ["sql", "args", "batched"])
+
+
+def query(sql, *args):
+    return Statement(sql, args, False)
+
+
+def batched(sql, *args):
+    return Statement(sql, args, True)
+
+
+def run(plan, execute, execute_batched):
+    """Run a plan, executing its statements with execute(sql, *args) or execute_batched(sql, *args)."""
+    result = None
+    try:
+        while True:
+            statement = plan.send(result)
+            run_statement = execute_batched if statement.batched else execute
+            result = run_statement(statement.sql, *statement.args)
+    except StopIteration as stop:
+        return stop.value
+
+
+async def run_async(plan, execute, execute_batched):
+    """Like run(), awaiting each statement."""
+    result = None
+    try:
+        while True:
+            statement = plan.send(result)
+            run_statement = execute_batched if statement.batched else execute
+            result = await run_statement(statement.sql, *statement.args)
+    except StopIteration as stop:
+        return stop.value
+
+
+def insert_transaction(user_id, description, amount, transaction_type, category, timestamp=None, recurring_id=None):
+    """Insert a transaction and return its id. recurring_id marks one added by that recurring rule."""
+
+    # The daily balance and data_version are updated by triggers in the same transaction (triggers.sql)
+    if timestamp is None:
+        return (yield batched(
+            "INSERT INTO transactions (user_id, description, amount, type, category, recurring_id) VALUES (?, ?, ?, ?, ?, ?)", user_id, description, amount, transaction_type, category, recurring_id
+        ))
+    return (yield batched(
+        "INSERT INTO transactions (user_id, description, amount, type, category, timestamp, recurring_id) VALUES (?, ?, ?, ?, ?, ?, ?)", user_id, description, amount, transaction_type, category, timestamp, recurring_id
+    ))
+
+
+def process_recurring_transactions(user_id):
+    """Checks and adds recurring transactions for the current month if not already added."""
+
+    current_month = datetime.now().strftime('%Y-%m') # '2025-10'
+
+    # Get the user's rules not processed yet this month
+    recurring_rules = yield query(
+        "SELECT * FROM recurring_transactions WHERE user_id = ? AND (last_added IS NULL OR last_added != ?)", user_id, current_month
+    )
+
+    for rule in recurring_rules:
+        day = min(rule["day_of_month"], 28)
+        transaction_date = f"{current_month}-{str(day).zfill(2)} 00:00:00"
+
+        # Insert the transaction in the transactions table
+        yield from insert_transaction(user_id, rule["description"], rule["amount"], rule["type"], rule["category"], transaction_date, rule["id"])
+
+        # Update that the rule was already processed this month
+        yield query(
+            "UPDATE recurring_transactions SET last_added = ? WHERE id = ?", current_month, rule["id"]
+        )
+
+
+def copy_previous_budgets(user_id):
+    """Copy last month's budgets to the actual month"""
+
+    current_month = datetime.now().strftime('%Y-%m')
+
+    current_budgets = yield query(
+        "SELECT id FROM budgets WHERE user_id = ? AND month = ?", user_id, current_month
+    )
+
+    if len(current_budgets) > 0:
+        return
+
+    last_month_recorded = yield query(
+        "SELECT MAX(month) as last_month FROM budgets WHERE user_id = ? AND month < ?", user_id, current_month
+    )
+
+    last_month = last_month_recorded[0]["last_month"]
+
+    if last_month:
+        yield query(
+            "INSERT INTO budgets (user_id, category_name, amount, month) SELECT user_id, category_name, amount, ? FROM budgets WHERE user_id = ? AND month = ?", current_month, user_id, last_month
+        )
+
+
+def month_range(month):
+    """Return the timestamp bounds [start, end) of month ('YYYY-MM'), which can use transactions_user_type_time."""
+
+    start = datetime.strptime(month, '%Y-%m').date()
+    return start.isoformat(), add_months(start, 1).isoformat()
+
+
+def month_totals(user_id, month):
+    """Return the user's (income, expense) totals for month ('YYYY-MM')."""
+
+    totals = yield query(
+        "SELECT type, SUM(amount) as total FROM transactions WHERE user_id = ? AND type IN ('Income', 'Expense') AND timestamp >= ? AND timestamp < ? GROUP BY type", user_id, *month_range(month)
+    )
+    totals_map = {row["type"]: row["total"] for row in totals}
+    return totals_map.get("Income") or 0, totals_map.get("Expense") or 0 # Use 0 if there are none
+
+
+def dashboard(user_id):
+    """Template values of the user's financial dashboard (index.html)."""
+
+    yield from copy_previous_budgets(user_id)
+
+    yield from process_recurring_transactions(user_id)
+
+    # Current month, '2025-10'
+    current_month = datetime.now().strftime('%Y-%m')
+
+    # Search user's name for greeting
+    username = (yield query("SELECT username FROM users WHERE id = ?", user_id))[0]["username"]
+
+    # Total monthly income and expenses
+    total_income, total_expense = yield from month_totals(user_id, current_month)
+
+    # Last 5 transactions
+    recent_transactions = yield query(
+        "SELECT * FROM transactions WHERE user_id = ? ORDER BY timestamp DESC LIMIT 5", user_id
+    )
+
+    # Budget's progress
+    budget_progress = []
+    budgets = yield query(
+        "SELECT category_name, amount FROM budgets WHERE user_id = ? AND month = ?", user_id, current_month
+    )
+
+    # Get total expense by category
+    expenses_by_category = yield query(
+        "SELECT category, SUM(amount) as total FROM transactions WHERE user_id = ? AND type = 'Expense' AND timestamp >= ? AND timestamp < ? GROUP BY category", user_id, *month_range(current_month)
+    )
+
+    # Transform the expenses list into a dictionary for easy search
+    spent_map = {item['category']: item['total'] for item in expenses_by_category}
+
+    # Spending forecast for every budgeted category, even those without expenses yet
+    budgeted_spent_map = {**{budget["category_name"]: 0 for budget in budgets}, **spent_map}
+    forecast_months, forecast = yield from spending_forecast(user_id, budgeted_spent_map)
+
+    for budget in budgets:
+        category = budget["category_name"]
+        spent = spent_map.get(category, 0) # Get the expense or 0, if it doesn't exist
+        percentage = (spent / budget["amount"]) * 100 if budget["amount"] > 0 else 0
+        projected = forecast[category]
+        budget_progress.append({
+            "category": category,
+            "budgeted": budget["amount"],
+            "spent": spent,
+            "percentage": percentage,
+            "projected": projected[0],
+            "projected_percentage": (projected[0] / budget["amount"]) * 100 if budget["amount"] > 0 else 0,
+            "next_months": list(zip(forecast_months[1:], projected[1:]))
+        })
+
+    return dict(username=username, total_income=total_income, total_expense=total_expense, balance=total_income - total_expense, recent_transactions=recent_transactions, budget_progress=budget_progress)
+
+
+def spending_forecast(user_id, spent_map):
+    """Project the spending of each category in spent_map (this month's spending so far) with forecast_spending()."""
+
+    # Expenses over the history window (recurring ones left out), one row per category with its days and amounts
+    # concatenated: a handful of rows instead of one per day keeps the query cheap through cs50.
+    # Plain timestamp bounds ('YYYY-MM-DD' sorts before any time that day) let the range use transactions_user_type_time
+    today = datetime.now().date()
+    history_start = (today - timedelta(days=HISTORY_DAYS)).isoformat()
+    expense_rows = yield query(
+        "SELECT category, group_concat(CAST(julianday(timestamp) - julianday(?) AS INTEGER)) as offsets, group_concat(amount) as amounts FROM transactions WHERE user_id = ? AND type = 'Expense' AND timestamp >= ? AND timestamp < ? AND recurring_id IS NULL GROUP BY category", history_start, user_id, history_start, today.isoformat()
+    )
+    expense_rules = yield query(
+        "SELECT category, amount, last_added FROM recurring_transactions WHERE user_id = ? AND type = 'Expense'", user_id
+    )
+    return forecast_spending(expense_rows, expense_rules, spent_map, today)
+
+
+def history(user_id, month_filter=None, category_filter=None):
+    """Template values of the user's transaction history (history.html), filtered by month (YYYY-MM) and category."""
+
+    # Make the query's beginning
+    sql = "SELECT * FROM transactions WHERE user_id = ?"
+
+    # Define the values that will take places of the ?
+    params = [user_id]
+
+    # Complemente the query based on the filter
+    if month_filter:
+        sql += " AND strftime('%Y-%m', timestamp) = ?"
+        params.append(month_filter)
+
+    if category_filter:
+        sql += " AND category = ?"
+        params.append(category_filter)
+
+    # It all is ordered based on the most recents
+    sql += " ORDER BY timestamp DESC"
+
+    transactions = yield query(sql, *params) # The * is a splat operator
+
+    # Get all the categories for the dropdown list
+    categories = yield query("SELECT name FROM categories WHERE user_id IS NULL OR user_id = ?", user_id)
+
+    return dict(transactions=transactions, categories=categories)
+
+
+def reports(user_id):
+    """Template values of the user's charts (reports.html)."""
+
+    # Get total of expenses per category on the actual month
+    current_month = datetime.now().strftime('%Y-%m') #"2025-10"
+    expenses_by_category = yield query(
+        "SELECT category, SUM(amount) as total FROM transactions WHERE user_id = ? AND type = 'Expense' AND timestamp >= ? AND timestamp < ? GROUP BY category ORDER BY total DESC", user_id, *month_range(current_month)
+    )
+
+    # Prepare data for Chart.js, with the default categories translated once here rather than per label in the template
+    catalog = get_catalog()
+    labels = []
+    data = []
+    for row in expenses_by_category:
+        labels.append(catalog.get(row["category"], row["category"]))
+        data.append(row["total"])
+
+    # Balance over time, read straight from the daily series the triggers maintain
+    balances = yield query(
+        "SELECT day, balance FROM daily_balances WHERE user_id = ? ORDER BY day", user_id
+    )
+    balance_days = [row["day"] for row in balances]
+    balance_data = [row["balance"] for row in balances]
+
+    return dict(labels=labels, data=data, balance_days=balance_days, balance_data=balance_data)
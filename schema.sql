@@ -4,12 +4,14 @@ DROP TABLE IF EXISTS transactions;
 DROP TABLE IF EXISTS users;
 DROP TABLE IF EXISTS budgets;
 DROP TABLE IF EXISTS recurring_transactions;
+DROP TABLE IF EXISTS daily_balances;
 
 -- Table to store the app users
 CREATE TABLE users (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     username TEXT NOT NULL UNIQUE,
-    hash TEXT NOT NULL
+    hash TEXT NOT NULL,
+    data_version INTEGER NOT NULL DEFAULT 0 -- Bumped on every change to the user's transactions or budgets
 );
 
 -- Table to store all transactions (income and expenses)
@@ -21,9 +23,13 @@ CREATE TABLE transactions (
     type TEXT NOT NULL,
     category TEXT NOT NULL,
     timestamp DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    recurring_id INTEGER, -- Recurring rule that added the transaction, NULL if added by the user
     FOREIGN KEY(user_id) REFERENCES users(id)
 );
 
+-- Per user and type date ranges (dashboard totals, spending forecast)
+CREATE INDEX transactions_user_type_time ON transactions(user_id, type, timestamp);
+
 -- Table to store user's custom categories
 CREATE TABLE categories (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -64,3 +70,14 @@ CREATE TABLE recurring_transactions (
     last_added TEXT, -- Store last transaction added's month
     FOREIGN KEY(user_id) REFERENCES users(id)
 );
+
+-- Table to store each user's running balance at the end of every day with transactions
+-- Kept up to date by the triggers in triggers.sql, which the app installs on first use
+CREATE TABLE daily_balances (
+    user_id INTEGER NOT NULL,
+    day TEXT NOT NULL, -- 'YYYY-MM-DD' format
+    net NUMERIC NOT NULL, -- Income minus expenses on that day
+    balance NUMERIC NOT NULL, -- Sum of net up to and including that day
+    FOREIGN KEY(user_id) REFERENCES users(id),
+    PRIMARY KEY(user_id, day)
+);
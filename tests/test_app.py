@@ -0,0 +1,216 @@
+import asyncio
+import os
+import sqlite3
+import sys
+
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The module-level app that asgi.py serves gets a throwaway database and fast hashes too
+os.environ["MYBUDGET_DATABASE"] = ":memory:"
+os.environ["MYBUDGET_HASH_METHOD"] = "pbkdf2:sha256:1000"
+
+import app as mybudget # noqa: E402
+from app import create_app, db # noqa: E402
+from writer import GroupCommitWriter, WriterStopped # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({"DATABASE": ":memory:", "HASH_METHOD": "pbkdf2:sha256:1000", "SESSION_FILE_DIR": str(tmp_path / "sessions")})
+    yield app
+    mybudget.close_resources(app)
+
+
+def register(app, username="user"):
+    """Return a test client logged in as a new user, and the user's id."""
+    client = app.test_client()
+    client.post("/register", data={"username": username, "password": "secret", "confirmation": "secret"})
+    with app.app_context():
+        return client, db.execute("SELECT id FROM users WHERE username = ?", username)[0]["id"]
+
+
+def batch(client, resource, payload):
+    response = client.post(f"/api/v1/{resource}/batch", json=payload)
+    assert response.status_code == 200
+    return response.get_json()["results"]
+
+
+def expected_balances(user_id):
+    """The daily series recomputed from scratch, as the triggers should have kept it."""
+    rows = db.execute(
+        "SELECT date(timestamp) as day, SUM(CASE WHEN type = 'Income' THEN amount ELSE -amount END) as net FROM transactions WHERE user_id = ? GROUP BY day ORDER BY day", user_id
+    )
+    balance = 0
+    series = []
+    for row in rows:
+        balance += row["net"]
+        series.append((row["day"], balance))
+    return series
+
+
+def stored_balances(user_id):
+    rows = db.execute("SELECT day, balance FROM daily_balances WHERE user_id = ? AND net != 0 ORDER BY day", user_id)
+    return [(row["day"], row["balance"]) for row in rows]
+
+
+def test_memory_apps_are_isolated(tmp_path):
+    first = create_app({"DATABASE": ":memory:", "SESSION_FILE_DIR": str(tmp_path)})
+    second = create_app({"DATABASE": ":memory:", "SESSION_FILE_DIR": str(tmp_path)})
+    with first.app_context():
+        db.execute("INSERT INTO users (username, hash) VALUES ('only-here', 'x')")
+    with second.app_context():
+        assert db.execute("SELECT * FROM users") == []
+
+
+def test_balance_triggers_repair_backdated_insert_update_and_delete(app):
+    client, user_id = register(app)
+    results = batch(client, "transactions", {"create": [
+        {"amount": 100, "type": "Income", "category": "Salary", "timestamp": "2025-01-10"},
+        {"amount": 30, "type": "Expense", "category": "Food", "timestamp": "2025-01-20"},
+    ]})
+    first, second = [result["id"] for result in results["create"]]
+
+    with app.app_context():
+        assert stored_balances(user_id) == [("2025-01-10", 100), ("2025-01-20", 70)]
+
+        # Backdated insert moves every later day
+        mybudget.insert_transaction(user_id, "old", 5, "Expense", "Food", "2025-01-01 09:00:00")
+        assert stored_balances(user_id) == expected_balances(user_id) == [("2025-01-01", -5), ("2025-01-10", 95), ("2025-01-20", 65)]
+
+    # Update moves the amount to another day
+    batch(client, "transactions", {"update": [{"id": second, "amount": 40, "timestamp": "2025-01-05"}]})
+    with app.app_context():
+        assert stored_balances(user_id) == expected_balances(user_id) == [("2025-01-01", -5), ("2025-01-05", -45), ("2025-01-10", 55)]
+
+    batch(client, "transactions", {"delete": [first]})
+    with app.app_context():
+        assert stored_balances(user_id) == expected_balances(user_id) == [("2025-01-01", -5), ("2025-01-05", -45)]
+
+
+def test_batch_rolls_back_only_the_failing_item(app, monkeypatch):
+    client, user_id = register(app)
+
+    # A handler that fails with a database error after it already wrote its row
+    def create_then_fail(connection, user_id, item):
+        result = mybudget.api_create_transaction(connection, user_id, item)
+        if item.get("description") == "fail":
+            raise sqlite3.IntegrityError("CHECK constraint failed: secret_table")
+        return result
+
+    handlers, changes_dashboard = mybudget.api_resources["transactions"]
+    monkeypatch.setitem(mybudget.api_resources, "transactions", ({**handlers, "create": create_then_fail}, changes_dashboard))
+
+    results = batch(client, "transactions", {"create": [
+        {"amount": 10, "type": "Expense", "category": "Food", "description": "kept"},
+        {"amount": 20, "type": "Expense", "category": "Food", "description": "fail"},
+        {"amount": "nan", "type": "Expense", "category": "Food", "description": "invalid"},
+        {"amount": 30, "type": "Expense", "category": "Food", "description": "also kept"},
+    ]})["create"]
+
+    assert [result["ok"] for result in results] == [True, False, False, True]
+    assert results[1]["error"] == "database_error"
+    assert "secret_table" not in results[1]["message"]
+    assert results[2]["error"] == "invalid_value"
+    with app.app_context():
+        rows = db.execute("SELECT description FROM transactions WHERE user_id = ? ORDER BY id", user_id)
+        assert [row["description"] for row in rows] == ["kept", "also kept"]
+        assert stored_balances(user_id) == expected_balances(user_id)
+
+
+def test_batch_rejects_unknown_actions(app):
+    client, _ = register(app)
+    response = client.post("/api/v1/transactions/batch", json={"creates": [{"amount": 10, "type": "Expense", "category": "Food"}]})
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "invalid_json"
+
+
+def test_writer_reports_each_write_result(tmp_path):
+    path = tmp_path / "writer.db"
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE items (name TEXT NOT NULL)")
+
+    writer = GroupCommitWriter(path.as_uri())
+    writer.start()
+    good = writer.submit("INSERT INTO items (name) VALUES (?)", "a")
+    bad = writer.submit("INSERT INTO items (name) VALUES (?)", None)
+    assert good.result(timeout=5) == 1
+    with pytest.raises(sqlite3.IntegrityError):
+        bad.result(timeout=5)
+
+    writer.stop()
+    with pytest.raises(WriterStopped):
+        writer.execute("INSERT INTO items (name) VALUES (?)", "b")
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("SELECT name FROM items").fetchall() == [("a",)]
+
+
+def test_writer_reports_why_it_stopped(tmp_path):
+    writer = GroupCommitWriter((tmp_path / "missing" / "writer.db").as_uri())
+    writer.start()
+    writer._thread.join(timeout=5) # dies opening the database
+
+    with pytest.raises(WriterStopped) as stopped:
+        writer.execute("INSERT INTO items (name) VALUES (?)", "a")
+    assert isinstance(stopped.value.__cause__, sqlite3.OperationalError)
+    writer.stop()
+
+
+async def asgi_get(application, path, query_string, cookie):
+    """Send one GET through the ASGI app, returning (status, body)."""
+
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query_string,
+        "headers": [(b"host", b"testserver"), (b"cookie", cookie.encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    await application(scope, receive, send)
+    return messages[0]["status"], b"".join(message.get("body", b"") for message in messages[1:]).decode()
+
+
+def test_async_history_applies_query_string_filters(tmp_path):
+    asgi = pytest.importorskip("asgi")
+    asgi.app.config["SESSION_FILE_DIR"] = str(tmp_path)
+
+    client, _ = register(asgi.app, "asgi-user")
+    month = datetime.now().strftime("%Y-%m")
+    batch(client, "transactions", {"create": [
+        {"amount": 11, "type": "Expense", "category": "Food", "description": "lunch", "timestamp": f"{month}-02"},
+        {"amount": 22, "type": "Expense", "category": "Leisure", "description": "cinema", "timestamp": f"{month}-03"},
+        {"amount": 33, "type": "Expense", "category": "Food", "description": "dinner", "timestamp": "2020-01-04"},
+    ]})
+    cookie = f"session={client.get_cookie('session').value}"
+
+    async def get_history():
+        try:
+            return await asgi_get(asgi.application, "/history", f"month={month}&category=Food".encode(), cookie)
+        finally:
+            # aiosqlite connections are threads that would keep the interpreter from exiting
+            await asgi.adb.close()
+            mybudget.close_resources(asgi.app)
+
+    status, body = asyncio.run(get_history())
+    assert status == 200
+    assert "lunch" in body
+    assert "cinema" not in body
+    assert "dinner" not in body
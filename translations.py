@@ -8,6 +8,7 @@ translations = {
         "nav_categories": "Manage Categories",
         "nav_reports": "Reports",
         "nav_budget": "Set Budgets",
+        "nav_analytics": "Budget Analytics",
         "nav_recurring": "Manage Recurring Transactions",
         "nav_logout": "Log Out",
         "nav_register": "Register",
@@ -16,10 +17,13 @@ translations = {
         #add.html
         "add_transaction": "Add a Transaction",
         "amount": "Amount",
+        "type": "Type",
         "input_transaction_type": "Select Transaction Type",
         "Income": "Income",
         "Expense": "Expense",
+        "category": "Category",
         "input_category": "Select Category",
+        "description": "Description",
         "input_description": "Description (Optional)",
         "submit_add": "Add",
         "Food": "Food",
@@ -50,6 +54,13 @@ translations = {
         "invalid_budget": "Must provide category and amount",
         "missing_recurring": "All field are required",
         "invalid_recurring": "Invalid amount or day of month",
+        "server_busy": "Server is busy, please try again in a moment",
+        "invalid_timestamp": "Timestamp must be YYYY-MM-DD or YYYY-MM-DD HH:MM:SS",
+        "not_found": "Not found",
+        "invalid_json": "Request body must be a JSON object with create, update and delete lists",
+        "batch_too_large": "Too many items in one batch",
+        "database_error": "This item could not be saved",
+        "login_required": "Log in required",
         #app.py - flash messages
         "success_transaction": "Transaction added successfully!",
         "delete_transaction": "Transaction deleted!",
@@ -59,6 +70,16 @@ translations = {
         "delete_budget": "Budget deleted!",
         "save_recurring": "Recurring transaction saved!",
         "delete_recurring": "Recurring transaction deleted!",
+        #budget_analytics.html
+        "budget_analytics": "Budget vs. Actual",
+        "last_12_months": "Last 12 months",
+        "last_24_months": "Last 24 months",
+        "overrun_months": "Months over budget",
+        "budgeted": "Budgeted",
+        "actual": "Actual",
+        "rolling_average": "3-month average",
+        "last_year": "Same month last year",
+        "no_analytics": "No budgets in this period yet.",
         #budget.html
         "budgets": "Budgets",
         "monthly_budget": "Set Monthly Budget",
@@ -94,6 +115,7 @@ translations = {
         "dash_no_budgets": "No budgets set for this month. Visit the",
         "budget_page": "Budget Page",
         "to_create": "to create.",
+        "projected": "Projected by month's end",
         #login.html
         "username": "Username",
         "password": "Password",
@@ -112,6 +134,8 @@ translations = {
         "expenses_by_category": "Expenses by Category",
         "spending_distribution": "Spending Distribution",
         "expenses": "Expenses",
+        "balance_over_time": "Balance Over Time",
+        "balance": "Balance",
     },
     "pt": {
         #layout.html
@@ -121,6 +145,7 @@ translations = {
         "nav_categories": "Gerenciar Categorias",
         "nav_reports": "Relatórios",
         "nav_budget": "Definir Orçamentos",
+        "nav_analytics": "Análise de Orçamentos",
         "nav_recurring": "Gerenciar Transações Recorrentes",
         "nav_logout": "Sair",
         "nav_register": "Registrar",
@@ -166,6 +191,13 @@ translations = {
         "invalid_budget": "Forneça categoria e quantia",
         "missing_recurring": "Todos os campos são obrigatórios",
         "invalid_recurring": "Quantia ou dia do mês inválidos",
+        "server_busy": "Servidor ocupado, tente novamente em instantes",
+        "invalid_timestamp": "A data deve estar no formato AAAA-MM-DD ou AAAA-MM-DD HH:MM:SS",
+        "not_found": "Não encontrado",
+        "invalid_json": "O corpo da requisição deve ser um objeto JSON com as listas create, update e delete",
+        "batch_too_large": "Itens demais em um único lote",
+        "database_error": "Não foi possível salvar este item",
+        "login_required": "É necessário entrar",
         #app.py - flash messages
         "success_transaction": "Transação adicionada com sucesso!",
         "delete_transaction": "Transação deletada!",
@@ -175,6 +207,16 @@ translations = {
         "delete_budget": "Orçamento deletado!",
         "save_recurring": "Transação recorrente salva!",
         "delete_recurring": "Transação recorrente deletada!",
+        #budget_analytics.html
+        "budget_analytics": "Orçado vs. Realizado",
+        "last_12_months": "Últimos 12 meses",
+        "last_24_months": "Últimos 24 meses",
+        "overrun_months": "Meses acima do orçamento",
+        "budgeted": "Orçado",
+        "actual": "Realizado",
+        "rolling_average": "Média de 3 meses",
+        "last_year": "Mesmo mês no ano anterior",
+        "no_analytics": "Nenhum orçamento neste período.",
         #budget.html
         "budgets": "Orçamentos",
         "monthly_budget": "Definir Orçamento Mensal",
@@ -210,6 +252,7 @@ translations = {
         "dash_no_budgets": "Nenhum orçamento definido para esse mês. Visite a",
         "budget_page": "Página de Orçamentos",
         "to_create": "para criar.",
+        "projected": "Previsto até o fim do mês",
         #login.html
         "username": "Nome de Usuário",
         "password": "Senha",
@@ -228,5 +271,7 @@ translations = {
         "expenses_by_category": "Despesas por Categoria",
         "spending_distribution": "Distribuição de Gastos",
         "expenses": "Gastos",
+        "balance_over_time": "Saldo ao Longo do Tempo",
+        "balance": "Saldo",
     }
 }
\ No newline at end of file
@@ -0,0 +1,63 @@
+-- Derived data kept up to date by SQLite itself, in the same transaction as the write that changes it.
+-- Run by the app (upgrade_database in app.py) whenever these triggers are missing.
+
+-- Every change to a user's transactions or budgets bumps users.data_version (invalidates cached analytics)
+-- and moves the daily running balance in daily_balances by the transaction's signed amount.
+CREATE TRIGGER IF NOT EXISTS transactions_insert AFTER INSERT ON transactions
+BEGIN
+    UPDATE users SET data_version = data_version + 1 WHERE id = NEW.user_id;
+    -- A day without transactions yet starts from the balance of the day before it
+    INSERT OR IGNORE INTO daily_balances (user_id, day, net, balance)
+        VALUES (NEW.user_id, date(NEW.timestamp), 0, COALESCE((SELECT balance FROM daily_balances WHERE user_id = NEW.user_id AND day < date(NEW.timestamp) ORDER BY day DESC LIMIT 1), 0));
+    UPDATE daily_balances SET net = net + (CASE WHEN NEW.type = 'Income' THEN NEW.amount ELSE -NEW.amount END)
+        WHERE user_id = NEW.user_id AND day = date(NEW.timestamp);
+    -- Today's transaction only touches one row; a backdated one repairs the days that follow it
+    UPDATE daily_balances SET balance = balance + (CASE WHEN NEW.type = 'Income' THEN NEW.amount ELSE -NEW.amount END)
+        WHERE user_id = NEW.user_id AND day >= date(NEW.timestamp);
+END;
+
+CREATE TRIGGER IF NOT EXISTS transactions_delete AFTER DELETE ON transactions
+BEGIN
+    UPDATE users SET data_version = data_version + 1 WHERE id = OLD.user_id;
+    UPDATE daily_balances SET net = net - (CASE WHEN OLD.type = 'Income' THEN OLD.amount ELSE -OLD.amount END)
+        WHERE user_id = OLD.user_id AND day = date(OLD.timestamp);
+    UPDATE daily_balances SET balance = balance - (CASE WHEN OLD.type = 'Income' THEN OLD.amount ELSE -OLD.amount END)
+        WHERE user_id = OLD.user_id AND day >= date(OLD.timestamp);
+END;
+
+-- An update takes the old row out of the balance and puts the new one in
+CREATE TRIGGER IF NOT EXISTS transactions_update AFTER UPDATE ON transactions
+BEGIN
+    UPDATE users SET data_version = data_version + 1 WHERE id IN (OLD.user_id, NEW.user_id);
+    UPDATE daily_balances SET net = net - (CASE WHEN OLD.type = 'Income' THEN OLD.amount ELSE -OLD.amount END)
+        WHERE user_id = OLD.user_id AND day = date(OLD.timestamp);
+    UPDATE daily_balances SET balance = balance - (CASE WHEN OLD.type = 'Income' THEN OLD.amount ELSE -OLD.amount END)
+        WHERE user_id = OLD.user_id AND day >= date(OLD.timestamp);
+    INSERT OR IGNORE INTO daily_balances (user_id, day, net, balance)
+        VALUES (NEW.user_id, date(NEW.timestamp), 0, COALESCE((SELECT balance FROM daily_balances WHERE user_id = NEW.user_id AND day < date(NEW.timestamp) ORDER BY day DESC LIMIT 1), 0));
+    UPDATE daily_balances SET net = net + (CASE WHEN NEW.type = 'Income' THEN NEW.amount ELSE -NEW.amount END)
+        WHERE user_id = NEW.user_id AND day = date(NEW.timestamp);
+    UPDATE daily_balances SET balance = balance + (CASE WHEN NEW.type = 'Income' THEN NEW.amount ELSE -NEW.amount END)
+        WHERE user_id = NEW.user_id AND day >= date(NEW.timestamp);
+END;
+
+CREATE TRIGGER IF NOT EXISTS budgets_insert AFTER INSERT ON budgets
+BEGIN
+    UPDATE users SET data_version = data_version + 1 WHERE id = NEW.user_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS budgets_update AFTER UPDATE ON budgets
+BEGIN
+    UPDATE users SET data_version = data_version + 1 WHERE id IN (OLD.user_id, NEW.user_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS budgets_delete AFTER DELETE ON budgets
+BEGIN
+    UPDATE users SET data_version = data_version + 1 WHERE id = OLD.user_id;
+END;
+
+-- Balances written before the triggers existed may be missing or stale: rebuild every user's series in one windowed pass
+DELETE FROM daily_balances;
+INSERT INTO daily_balances (user_id, day, net, balance)
+    SELECT user_id, day, net, SUM(net) OVER (PARTITION BY user_id ORDER BY day)
+    FROM (SELECT user_id, date(timestamp) as day, SUM(CASE WHEN type = 'Income' THEN amount ELSE -amount END) as net FROM transactions GROUP BY user_id, day);
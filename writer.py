@@ -0,0 +1,139 @@
+import queue
+import sqlite3
+import threading
+import time
+
+from concurrent.futures import Future
+
+
+class WriterStopped(RuntimeError):
+    """Raised for writes submitted to (or still queued on) a writer that is no longer running."""
+
+
+class GroupCommitWriter:
+    """Collect writes from many request threads and commit them in batches on one thread."""
+
+    def __init__(self, database_uri, max_batch=256, max_delay=0.005):
+        self.database_uri = database_uri
+        self.max_batch = max_batch
+        self.max_delay = max_delay # Seconds a write may wait for others to join its batch
+        self._queue = queue.Queue()
+        self._thread = None
+        self._running = False
+        self._error = None # What stopped the thread, if it didn't stop cleanly
+        self._batch = [] # Writes taken off the queue and not committed yet
+        self._lock = threading.Lock() # Orders submit() against stop() and the thread exiting
+
+    def start(self):
+        """Start the writer thread."""
+        if self._thread is None:
+            self._running = True
+            self._error = None
+            self._thread = threading.Thread(target=self._run, name="group-commit-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Flush pending writes and stop the writer thread."""
+        if self._thread is not None:
+            with self._lock:
+                if self._running:
+                    self._running = False
+                    self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, sql, *args):
+        """Queue a write and return a Future for its row id. Raises WriterStopped if the writer isn't running."""
+        future = Future()
+        with self._lock:
+            if not self._running:
+                raise WriterStopped("group-commit writer is not running") from self._error
+            self._queue.put((sql, args, future))
+        return future
+
+    def execute(self, sql, *args):
+        """Queue a write and wait until its batch is committed. Returns the new row's id."""
+        return self.submit(sql, *args).result()
+
+    def _run(self):
+        error = WriterStopped("group-commit writer stopped")
+        try:
+            self._serve()
+        except Exception as e:
+            # Whatever killed the thread is what every waiting write gets
+            error = self._error = e
+        finally:
+            with self._lock:
+                self._running = False
+            # No write can be queued anymore: fail the ones still pending so no caller waits forever
+            pending = [future for sql, args, future in self._batch]
+            while not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is not None:
+                    pending.append(item[2])
+            for future in pending:
+                if not future.done():
+                    future.set_exception(error)
+            self._batch = []
+
+    def _serve(self):
+        # sqlite3 connection owned by this thread only
+        connection = sqlite3.connect(self.database_uri, uri=True, isolation_level=None, timeout=30)
+        connection.execute("PRAGMA foreign_keys=ON")
+
+        running = True
+        while running:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = self._batch = [item]
+
+            # Keep collecting until the batch is full or the latency window closes
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    running = False
+                    break
+                batch.append(item)
+
+            self._commit(connection, batch)
+            self._batch = []
+
+        connection.close()
+
+    def _commit(self, connection, batch):
+        """Run a batch in one transaction, isolating each write in its own savepoint."""
+        results = []
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            for sql, args, future in batch:
+                connection.execute("SAVEPOINT item")
+                try:
+                    cursor = connection.execute(sql, args)
+                except sqlite3.Error as e:
+                    # Undo only this write, the rest of the batch still commits
+                    connection.execute("ROLLBACK TO item")
+                    connection.execute("RELEASE item")
+                    results.append((future, None, e))
+                else:
+                    connection.execute("RELEASE item")
+                    results.append((future, cursor.lastrowid, None))
+            connection.execute("COMMIT")
+        except sqlite3.Error as e:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            for sql, args, future in batch:
+                future.set_exception(e)
+            return
+
+        # Only report row ids once they are durable
+        for future, row_id, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(row_id)